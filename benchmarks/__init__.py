@@ -0,0 +1 @@
+#synthetic inputs and timings for the report tools, run from the repository root with python -m benchmarks.run_benchmarks
@@ -0,0 +1,176 @@
+import json
+import os
+import struct
+import zlib
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import numpy as np
+import pandas as pd
+
+
+#internal feature names the synthetic config renames client columns to
+FEATURES = [
+    "area_land_sqft",
+    "area_finished_sqft",
+    "sale_date",
+    "valid_sale",
+    "sale_price",
+    "neighborhood",
+    "zip",
+    "building_year_built",
+    "heat_type_desc",
+    "zoning",
+    "rooms_bed",
+    "rooms_full_bath",
+]
+
+#rows per table at each scale
+SIZES = {
+    'small': 10_000,
+    'medium': 200_000,
+    'large': 2_000_000,
+}
+
+
+def feature_name(i: int) -> str:
+    if i < len(FEATURES):
+        return FEATURES[i]
+    return f"extra_feature_{i}"
+
+
+#null rate per column, spread evenly between 0 and max_null_rate so every threshold band is hit
+def null_rates(n_cols: int, max_null_rate: float = 0.9) -> np.ndarray:
+    return np.linspace(0, max_null_rate, n_cols)
+
+
+def random_values(rng, n_rows: int, null_rate: float) -> np.ndarray:
+    values = rng.integers(0, 1_000_000, n_rows).astype(str).astype(object)
+    values[rng.random(n_rows) < null_rate] = None
+    return values
+
+
+def parcel_ids(n_rows: int) -> np.ndarray:
+    return np.char.add("P", np.arange(n_rows).astype(str))
+
+
+#config.json renaming CLIENT_{i} columns in each table to the internal feature names
+def write_config(path: str, n_cols: int, tables: list) -> None:
+    data = {}
+    for table in tables:
+        rename = {"PARCEL_ID": "key_primary"}
+        for i in range(n_cols):
+            rename[f"CLIENT_{i}"] = feature_name(i)
+        data[table] = {'transform': {'rename': rename}}
+
+    with open(path, "w") as json_file:
+        json.dump({'data': data}, json_file, indent=2)
+
+
+#wide parcel csvs as delivered by a client, the layout Create_Report reads from csv/
+def write_parcel_csvs(folder: str, n_files: int, n_rows: int, n_cols: int, seed: int = 0) -> list:
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    rates = null_rates(n_cols)
+    ids = parcel_ids(n_rows)
+
+    paths = []
+    for f in range(n_files):
+        df = pd.DataFrame({'PARCEL_ID': ids})
+        for i in range(n_cols):
+            df[f"CLIENT_{i}"] = random_values(rng, n_rows, rates[i])
+        path = os.path.join(folder, f"table_{f}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+#the intermediate parquet create_missing_features_report reads, a share of rows has no dataset
+def write_intermediate_parquet(path: str, n_rows: int, n_cols: int, n_datasets: int = 8, seed: int = 0, row_group_size: int = 100_000) -> None:
+    rng = np.random.default_rng(seed)
+    rates = null_rates(n_cols)
+
+    datasets = np.array([f"dataset_{i}" for i in range(n_datasets)], dtype=object)
+    dataset = datasets[rng.integers(0, n_datasets, n_rows)]
+    dataset[rng.random(n_rows) < 0.05] = None
+
+    #sorted by dataset so most row groups hold a single dataset, like the real intermediates
+    order = np.argsort(np.where(pd.isna(dataset), "~", dataset).astype(str), kind='stable')
+
+    df = pd.DataFrame({
+        'dataset': dataset[order],
+        'latitude': rng.uniform(39.0, 40.0, n_rows),
+        'longitude': rng.uniform(-105.5, -104.5, n_rows),
+    })
+    for i in range(n_cols):
+        df[feature_name(i)] = random_values(rng, n_rows, rates[i])
+
+    df.to_parquet(path, index=False, row_group_size=row_group_size)
+
+
+def description_html(values: dict) -> str:
+    rows = "".join(f"<tr><td>{k}</td><td>{v}</td></tr>" for k, v in values.items())
+    return f"<html><body><table><tr><th>Field</th><th>Value</th></tr>{rows}</table></body></html>"
+
+
+#kmz of parcel placemarks with html description tables, alternating points and square polygons
+#missing cells are empty or, when given, one of na_values, the last late_cols columns only show up from the middle placemark on
+def write_kmz(path: str, n_placemarks: int, n_cols: int, seed: int = 0, na_values: list = (), late_cols: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    rates = null_rates(n_cols)
+    empties = [""] + list(na_values)
+
+    with ZipFile(path, 'w', ZIP_DEFLATED) as kmz:
+        with kmz.open('doc.kml', 'w') as kml:
+            kml.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            kml.write(b'<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>\n')
+
+            for p in range(n_placemarks):
+                values = {'PARCEL_ID': f"P{p}"}
+                for i in range(n_cols):
+                    if i >= n_cols - late_cols and p < n_placemarks // 2:
+                        continue
+                    if rng.random() < rates[i]:
+                        values[f"CLIENT_{i}"] = empties[rng.integers(len(empties))] if na_values else ""
+                    else:
+                        values[f"CLIENT_{i}"] = str(rng.integers(0, 1_000_000))
+
+                lon, lat = rng.uniform(-105.5, -104.5), rng.uniform(39.0, 40.0)
+                if p % 2:
+                    geometry = f"<Point><coordinates>{lon},{lat},0</coordinates></Point>"
+                else:
+                    d = 0.0005
+                    ring = " ".join(f"{x},{y},0" for x, y in [(lon, lat), (lon + d, lat), (lon + d, lat + d), (lon, lat + d), (lon, lat)])
+                    geometry = f"<Polygon><outerBoundaryIs><LinearRing><coordinates>{ring}</coordinates></LinearRing></outerBoundaryIs></Polygon>"
+
+                placemark = f"<Placemark><name>P{p}</name><description><![CDATA[{description_html(values)}]]></description>{geometry}</Placemark>\n"
+                kml.write(placemark.encode())
+
+            kml.write(b'</Folder></Document></kml>\n')
+
+
+#reference parcels for the Create_Report gpkg join
+def write_reference_gpkg(path: str, n_rows: int, seed: int = 0) -> None:
+    import geopandas as gpd
+
+    rng = np.random.default_rng(seed)
+    gdf = gpd.GeoDataFrame(
+        {'PARCEL_ID': parcel_ids(n_rows)},
+        geometry=gpd.points_from_xy(rng.uniform(-105.5, -104.5, n_rows), rng.uniform(39.0, 40.0, n_rows)),
+        crs='EPSG:4326'
+    )
+    gdf.to_file(path, driver="GPKG")
+
+
+#the pdf footer needs logos/test.png, a flat 1x1 png is enough
+def write_logo(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    png = b"\x89PNG\r\n\x1a\n"
+    png += chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(b"\x00\x2d\xa6\x99"))
+    png += chunk(b"IEND", b"")
+    with open(path, "wb") as f:
+        f.write(png)
@@ -0,0 +1,133 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from . import generators
+
+
+def peak_rss_mb() -> float:
+    #ru_maxrss is in KB on linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss /= 1024
+    return rss / 1024
+
+
+def bench_create_report(workdir: str, n_rows: int, n_files: int) -> int:
+    from data_processing_tools.init_data_report.init_data_report import Create_Report
+
+    report = Create_Report(gpkg_path=os.path.join(workdir, 'reference.gpkg'), gpkg_id='PARCEL_ID', output_formats=['pdf', 'json'])
+    report.create_report()
+    return n_rows * n_files
+
+
+def bench_dataset_report(workdir: str, n_rows: int, n_files: int) -> int:
+    from data_processing_tools.dataset_missing_report.create_dataset_report import create_missing_features_report
+
+    create_missing_features_report(os.path.join(workdir, 'intermediate.parquet'), os.path.join(workdir, 'config.json'), 100, 0, create_shp=True, output_formats=['pdf', 'json'])
+    return n_rows
+
+
+def bench_kmz_to_csv(workdir: str, n_rows: int, n_files: int) -> int:
+    from data_processing_tools.kmz_to_csv.kmz_to_csv import kmz_to_csv
+
+    kmz_to_csv(os.path.join(workdir, 'parcels.kmz'), stream=True)
+    return n_rows
+
+
+STAGES = {
+    'create_report': bench_create_report,
+    'dataset_report': bench_dataset_report,
+    'kmz_to_csv': bench_kmz_to_csv,
+}
+
+
+#runs in a fresh process so peak rss belongs to this stage alone
+def run_stage(stage: str, workdir: str, n_rows: int, n_files: int, queue) -> None:
+    os.chdir(workdir)
+    start = time.perf_counter()
+    rows = STAGES[stage](workdir, n_rows, n_files)
+    seconds = time.perf_counter() - start
+    queue.put({'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'rows': rows})
+
+
+def measure(stage: str, workdir: str, n_rows: int, n_files: int) -> dict:
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_stage, args=(stage, workdir, n_rows, n_files, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        return {'stage': stage, 'error': f"exit code {process.exitcode}"}
+
+    result = queue.get()
+    result['stage'] = stage
+    result['rows_per_sec'] = result['rows'] / result['seconds'] if result['seconds'] else None
+    return result
+
+
+#deterministic inputs for every tool at one size
+def generate(workdir: str, n_rows: int, n_cols: int, n_files: int) -> dict:
+    timings = {}
+    steps = [
+        ('config', lambda: generators.write_config(os.path.join(workdir, 'config.json'), n_cols, [f"table_{f}" for f in range(n_files)])),
+        ('csv', lambda: generators.write_parcel_csvs(os.path.join(workdir, 'csv'), n_files, n_rows, n_cols)),
+        ('parquet', lambda: generators.write_intermediate_parquet(os.path.join(workdir, 'intermediate.parquet'), n_rows, n_cols)),
+        ('kmz', lambda: generators.write_kmz(os.path.join(workdir, 'parcels.kmz'), n_rows, n_cols)),
+        ('gpkg', lambda: generators.write_reference_gpkg(os.path.join(workdir, 'reference.gpkg'), n_rows)),
+        ('logo', lambda: generators.write_logo(os.path.join(workdir, 'logos', 'test.png'))),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def print_results(size: str, results: list) -> None:
+    print(f"\n{size}")
+    print(f"{'stage':<16}{'seconds':>10}{'peak MB':>10}{'rows/sec':>14}")
+    for r in results:
+        if 'error' in r:
+            print(f"{r['stage']:<16}{r['error']:>34}")
+            continue
+        print(f"{r['stage']:<16}{r['seconds']:>10.2f}{r['peak_rss_mb']:>10.0f}{r['rows_per_sec']:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the report tools on synthetic parcel data")
+    parser.add_argument('--sizes', nargs='+', default=['small'], choices=list(generators.SIZES))
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--columns', type=int, default=60)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--json', help="write all results to this file")
+    parser.add_argument('--keep', action='store_true', help="keep the generated data directories")
+    args = parser.parse_args()
+
+    all_results = {}
+    for size in args.sizes:
+        n_rows = generators.SIZES[size]
+        workdir = tempfile.mkdtemp(prefix=f"bench_{size}_")
+
+        generation = generate(workdir, n_rows, args.columns, args.files)
+        results = [measure(stage, workdir, n_rows, args.files) for stage in args.stages]
+        print_results(size, results)
+
+        all_results[size] = {'rows': n_rows, 'columns': args.columns, 'files': args.files, 'generation_seconds': generation, 'stages': results}
+        if args.keep:
+            print(f"data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(all_results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+#the tests import data_processing_tools and benchmarks from the repository root,
+#pytest puts the directory of this conftest on sys.path
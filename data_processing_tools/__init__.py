@@ -0,0 +1,2 @@
+#missing value reports for client deliveries
+#run the tools from the repository root, e.g. python -m data_processing_tools.init_data_report
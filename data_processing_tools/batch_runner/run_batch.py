@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .. import instrumentation
+from ..config_index import ConfigIndex
+
+#runs a manifest of report jobs in one long lived process pool
+#each worker pays the pandas/geopandas/reportlab import once and then takes jobs until the batch is done,
+#so one job's csv/parquet loading overlaps with another's profiling and pdf building
+#
+#the manifest is a json list of jobs:
+#  {"name": "client_a", "tool": "create_report", "input": "deliveries/client_a/csv", "config": "deliveries/client_a/config.json",
+#   "high": 100, "low": 0, "output_dir": "reports/client_a", "options": {"gpkg_path": "...", "gpkg_id": "PARCEL_ID"}}
+#tool is create_report (input is a csv folder or a .kmz) or dataset_report (input is an intermediate parquet file),
+#options are passed on as keyword arguments to Create_Report or create_missing_features_report
+#a job can give "config_index" (compiled with python -m data_processing_tools.config_index) instead of "config"
+
+
+def warm_up() -> None:
+    for module in ('pandas', 'pyarrow', 'geopandas', 'reportlab.platypus', '..init_data_report.init_data_report', '..dataset_missing_report.create_dataset_report'):
+        try:
+            importlib.import_module(module, __package__)
+        except ImportError:
+            pass
+
+
+#compiled config indexes kept for the life of the worker, jobs sharing a config only parse it once
+_indexes = {}
+
+
+def job_config_index(job: dict) -> ConfigIndex:
+    compiled = 'config_index' in job
+    path = job['config_index'] if compiled else job['config']
+    stat = os.stat(path)
+    key = (os.path.abspath(path), compiled, stat.st_size, stat.st_mtime_ns)
+    if key not in _indexes:
+        _indexes[key] = ConfigIndex.load(path) if compiled else ConfigIndex.from_config(path)
+    return _indexes[key]
+
+
+def run_create_report(job: dict) -> None:
+    from ..init_data_report.init_data_report import Create_Report
+
+    report = Create_Report(high=job['high'], low=job['low'], report_dir=job['output_dir'], config_index=job_config_index(job), **job['options'])
+    if job['input'].endswith('.kmz'):
+        report.profile_kmz(job['input'])
+        report.write_outputs()
+    else:
+        report.create_report(job['input'])
+
+
+def run_dataset_report(job: dict) -> None:
+    from ..dataset_missing_report.create_dataset_report import create_missing_features_report
+
+    create_missing_features_report(job['input'], job.get('config'), job['high'], job['low'], report_dir=job['output_dir'],
+                                   config_index=job_config_index(job), **job['options'])
+
+
+TOOLS = {
+    'create_report': run_create_report,
+    'dataset_report': run_dataset_report,
+}
+
+
+def job_result(job: dict, status: str, error: str = None) -> dict:
+    return {'name': job['name'], 'tool': job.get('tool'), 'status': status, 'error': error, 'seconds': None, 'peak_rss_mb': None, 'rss_delta_mb': None, 'stages': []}
+
+
+#runs in a pool worker, the tools print a lot so each job's output goes to its own log
+#any exception stays inside the job's result
+def run_job(job: dict) -> dict:
+    result = job_result(job, 'ok')
+    instrumentation.reset()
+    os.makedirs(job['output_dir'], exist_ok=True)
+
+    #workers run many jobs, so memory is sampled over this job alone rather than read from the worker's high-water mark
+    start = time.perf_counter()
+    with open(os.path.join(job['output_dir'], 'job.log'), "w") as log, contextlib.redirect_stdout(log), instrumentation.RssSampler() as memory:
+        try:
+            TOOLS[job['tool']](job)
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=log)
+
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    result['peak_rss_mb'] = memory.peak
+    result['rss_delta_mb'] = memory.delta_mb
+    result['stages'] = instrumentation.records()
+    return result
+
+
+#fills in defaults, returns an error message for jobs that can't be run
+def prepare_job(job: dict, i: int) -> str:
+    job.setdefault('name', f"job_{i}")
+    job.setdefault('high', 100)
+    job.setdefault('low', 0)
+    job.setdefault('options', {})
+
+    if job.get('tool') not in TOOLS:
+        return f"unknown tool {job.get('tool')!r}, expected one of {', '.join(TOOLS)}"
+    missing = [k for k in ('input', 'output_dir') if k not in job]
+    if 'config' not in job and 'config_index' not in job:
+        missing.append('config')
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if not os.path.exists(job['input']):
+        return f"input {job['input']} does not exist"
+    return None
+
+
+class BatchRunner():
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pool = self.new_pool(workers)
+        #jobs are only handed to the pool when a worker is free, so a broken pool only takes the running jobs with it
+        self.slots = asyncio.Semaphore(workers)
+
+
+    def new_pool(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+
+
+    async def run(self, job: dict) -> dict:
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            pool = self.pool
+            try:
+                return await loop.run_in_executor(pool, run_job, job)
+            except BrokenProcessPool:
+                if self.pool is pool:
+                    pool.shutdown(wait=False)
+                    self.pool = self.new_pool(self.workers)
+
+            #a worker that dies (e.g. a crash inside gdal) breaks the pool for every job running in it,
+            #rerunning each of those alone means only the job that crashes is marked as failed
+            isolated = self.new_pool(1)
+            try:
+                return await loop.run_in_executor(isolated, run_job, job)
+            except BrokenProcessPool:
+                return job_result(job, 'failed', "worker process died")
+            finally:
+                isolated.shutdown(wait=False)
+
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+
+def write_summary(summary_path: str, results: list) -> None:
+    tmp_path = f"{summary_path}.tmp"
+    with open(tmp_path, "w") as json_file:
+        json.dump([r for r in results if r is not None], json_file, indent=2)
+    os.replace(tmp_path, summary_path)
+
+
+#the summary is rewritten as each job finishes so an interrupted batch still has one
+async def run_batch(jobs: list, workers: int, summary_path: str) -> list:
+    results = [None] * len(jobs)
+    runner = BatchRunner(workers)
+
+    async def run_one(i: int, job: dict) -> None:
+        error = prepare_job(job, i)
+        result = job_result(job, 'failed', error) if error else await runner.run(job)
+        results[i] = result
+        print(f"{result['name']:<30}{result['status']:>8}{result['seconds'] or 0:>10.1f}s  {result['error'] or ''}")
+        write_summary(summary_path, results)
+
+    try:
+        await asyncio.gather(*(run_one(i, job) for i, job in enumerate(jobs)))
+    finally:
+        runner.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many report jobs from a manifest in one process pool")
+    parser.add_argument('manifest', help="json list of jobs")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="jobs running at once")
+    parser.add_argument('--summary', default='batch_summary.json', help="per job status and timings")
+    args = parser.parse_args()
+
+    with open(args.manifest, "r") as json_file:
+        jobs = json.load(json_file)
+
+    results = asyncio.run(run_batch(jobs, args.workers, args.summary))
+    failed = [r['name'] for r in results if r['status'] != 'ok']
+    print(f"\n{len(results) - len(failed)} of {len(results)} jobs succeeded")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import json
+
+
+#everything the report tools look up from config.json, parsed once
+#client_to_feature: client column -> our feature name (used by Create_Report)
+#feature_to_client: our feature name -> [client column, table] (used by create_dataset_report)
+#groups: client column -> importance group, 0 primary, 1 secondary, 2 other
+#key_columns: client columns that map to key_primary, in config order
+#an index can be compiled once with save() and handed to either tool with --config-index
+class ConfigIndex():
+
+    def __init__(self, client_to_feature: dict, feature_to_client: dict, groups: dict = None, key_columns: list = None):
+        self.client_to_feature = client_to_feature
+        self.feature_to_client = feature_to_client
+        self.groups = groups or {}
+        self.key_columns = key_columns or []
+
+
+    @classmethod
+    def from_config(cls, config_path: str, primary_fields: list = (), secondary_fields: list = ()):
+        with open(config_path, "r") as json_file:
+            config = json.load(json_file)
+
+        client_to_feature = {}
+        feature_to_client = {}
+        data = config['data']
+
+        for d in data:
+            if not 'transform' in data[d]:
+                continue
+            transform = data[d]['transform']
+
+            if 'rename' in transform:
+                rename = transform['rename']
+                for r in rename:
+                    feature_to_client[rename[r]] = [r, d]
+
+            if 'math' in transform:
+                maths = transform['math']
+                for m in maths:
+                    if not 'values' in maths[m]:
+                        continue
+                    values = maths[m]['values']
+                    if not isinstance(values, list):
+                        continue
+                    for value in values:
+                        if not isinstance(value, str):
+                            continue
+                        client_to_feature[value] = m
+                    if len(values) == 1 and isinstance(values[0], str):
+                        feature_to_client[values[0]] = feature_to_client.get(values[0], [m, d])
+
+            #renames win over math values within the same table
+            if 'rename' in transform:
+                rename = transform['rename']
+                for r in rename:
+                    client_to_feature[r] = rename[r]
+
+        index = cls(client_to_feature, feature_to_client)
+        index.compile_groups(primary_fields, secondary_fields)
+        return index
+
+
+    #precomputes the importance group and key columns so lookups per feature are O(1)
+    def compile_groups(self, primary_fields: list, secondary_fields: list) -> None:
+        primary = set(primary_fields)
+        secondary = set(secondary_fields)
+
+        self.groups = {}
+        self.key_columns = []
+        for column, feature in self.client_to_feature.items():
+            group = 2
+            if feature in primary:
+                group = 0
+            elif feature in secondary:
+                group = 1
+            self.groups[column] = group
+
+            if feature == 'key_primary':
+                self.key_columns.append(column)
+
+
+    #a copy with the groups compiled for these fields, so one parsed config can serve reports with different field lists
+    def with_groups(self, primary_fields: list, secondary_fields: list):
+        index = type(self)(self.client_to_feature, self.feature_to_client)
+        index.compile_groups(primary_fields, secondary_fields)
+        return index
+
+
+    def group(self, column: str) -> int:
+        return self.groups.get(column, 2)
+
+
+    def to_dict(self) -> dict:
+        return {
+            'client_to_feature': self.client_to_feature,
+            'feature_to_client': self.feature_to_client,
+            'groups': self.groups,
+            'key_columns': self.key_columns,
+        }
+
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['client_to_feature'], data['feature_to_client'], data['groups'], data['key_columns'])
+
+
+    def save(self, file_path: str) -> None:
+        with open(file_path, "w") as json_file:
+            json.dump(self.to_dict(), json_file)
+
+
+    @classmethod
+    def load(cls, file_path: str):
+        with open(file_path, "r") as json_file:
+            return cls.from_dict(json.load(json_file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile config.json into an index both report tools can load with --config-index")
+    parser.add_argument('config', help="client config.json")
+    parser.add_argument('output', help="compiled index json")
+    args = parser.parse_args()
+
+    ConfigIndex.from_config(args.config).save(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+from .create_dataset_report import main
+
+main()
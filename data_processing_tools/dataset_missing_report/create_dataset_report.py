@@ -0,0 +1,481 @@
+import argparse
+import pandas as pd
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+import numpy as np
+
+from .. import instrumentation
+from ..config_index import ConfigIndex
+from ..sampling import z_score, cluster_interval, straddles
+from ..spatial_overview import tile_layer, TILE_LAYER
+
+
+#reportlab and geopandas are imported where they're used so importing this module stays light
+def export_to_pdf(data_list, sections, file_path: str = "report/condominiums_report.pdf", estimated: bool = False):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    # Define data
+    title = "Missing Values Report"
+
+    # Create the PDF file
+    doc = SimpleDocTemplate(file_path, pagesize=letter)
+
+    # Create styles
+    styles = getSampleStyleSheet()
+    title_style = styles['Title']
+    subtitle_style = styles['Heading2']
+
+    # Add title and subtitle as Paragraphs
+    title_paragraph = Paragraph(title, title_style)
+    
+    elements = [title_paragraph, Spacer(1, 12)]
+    
+    if estimated:
+        note = "Percentages marked ~ were estimated from a sample of rows, the confidence intervals are in the json/parquet statistics."
+        elements += [Paragraph(note, styles['Italic']), Spacer(1, 12)]
+    
+    n = 0
+    for st in sections:
+        subtitle_paragraph = Paragraph(st, subtitle_style)
+        elements.append(subtitle_paragraph)
+        elements.append(Spacer(1, 12))
+
+        # Create the table
+        table = Table(data_list[n], colWidths=[150, 200, 80])  # Adjust column widths as needed
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        
+        elements.append(table)
+        elements.append(Spacer(1, 12))
+        n += 1
+
+    doc.build(elements)
+    print(f"PDF saved to {file_path}")
+
+
+#writes every layer for a dataset with pyogrio's arrow writer, each layer goes in as one batch in one transaction
+#layers are GeoDataFrames or arrow tables with a WKB geometry column (the feature layers, already filtered from one encoding)
+#pyogrio has no way to keep the file open between layers, so sqlite's fsync per commit is turned off while writing instead
+#falls back to one to_file call per layer when pyogrio's GDAL is older than 3.8
+def write_gpkg_layers(file_path: str, layers: dict) -> None:
+    import pyogrio
+
+    if pyogrio.__gdal_version__ < (3, 8, 0):
+        for name, layer in layers.items():
+            if isinstance(layer, pa.Table):
+                import geopandas as gpd
+                layer = gpd.GeoDataFrame.from_arrow(layer)
+            layer.to_file(file_path, layer=name, driver="GPKG", SPATIAL_INDEX="YES")
+        return
+    
+    synchronous = pyogrio.get_gdal_config_option('OGR_SQLITE_SYNCHRONOUS')
+    pyogrio.set_gdal_config_options({'OGR_SQLITE_SYNCHRONOUS': 'OFF'})
+    try:
+        for name, layer in layers.items():
+            #feature layers are points, the overview tiles are polygons
+            geometry_type = 'Point'
+            if not isinstance(layer, pa.Table):
+                if len(layer):
+                    geometry_type = layer.geom_type.iloc[0]
+                layer = layer.to_arrow(index=False, geometry_encoding='WKB')
+            
+            #an existing layer of the same name is replaced, like to_file does
+            pyogrio.write_arrow(layer, file_path, layer=name, driver="GPKG", geometry_name='geometry', geometry_type=geometry_type,
+                                crs='EPSG:4326', append=False, layer_options={'SPATIAL_INDEX': 'YES'})
+    finally:
+        pyogrio.set_gdal_config_options({'OGR_SQLITE_SYNCHRONOUS': synchronous})
+
+
+#one layer per feature holding the points of the rows missing that feature
+#with tile_size, an extra grid layer holds the missing count per feature for each cell
+def create_gpkg(df: pd.DataFrame, dataset: str, features: list, report_dir: str = 'report', tile_size: float = None) -> None:
+    import geopandas as gpd
+
+    shapefile_dir = os.path.join(report_dir, 'shapefiles')
+    os.makedirs(shapefile_dir, exist_ok=True) 
+    
+    #build the points once for the whole dataset
+    points = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(df['longitude'], df['latitude']),
+        crs='EPSG:4326'
+    )
+
+    #the points are encoded to WKB once, each feature layer is a filter over that table
+    points_table = pa.table(points.to_arrow(index=False, geometry_encoding='WKB'))
+    layers = {}
+    for feature in features:
+        layers[feature] = points_table.filter(pa.array(df[feature].isna().to_numpy()))
+    
+    if tile_size:
+        masks = {feature: df[feature].isna().to_numpy() for feature in features}
+        layers[TILE_LAYER] = tile_layer(points.geometry, masks, tile_size)
+    
+    write_gpkg_layers(os.path.join(shapefile_dir, f"{dataset}.gpkg"), layers)
+
+
+#adds one dataset's rows to the running totals and null counts
+def add_counts(totals: dict, missing_counts: dict, columns: list, dataset, total_count: int, counts: dict) -> None:
+    if dataset not in totals:
+        totals[dataset] = 0
+        missing_counts[dataset] = dict.fromkeys(columns, 0)
+    totals[dataset] += total_count
+    #the dataset column is only ever missing for the rows outside of datasets
+    if dataset is None:
+        missing_counts[dataset]['dataset'] += total_count
+    for col, count in counts.items():
+        missing_counts[dataset][col] += count
+
+
+#when a row group holds a single dataset the column statistics already have the null counts
+#returns (dataset, counts) in that case, otherwise None
+def single_dataset_counts(meta, columns: list, feature_columns: list):
+    stats = {}
+    for i in range(meta.num_columns):
+        col_meta = meta.column(i)
+        stats[col_meta.path_in_schema] = col_meta.statistics
+    
+    if not all(stats.get(c) is not None and stats[c].has_null_count for c in columns):
+        return None
+    
+    dataset_stats = stats['dataset']
+    if dataset_stats.null_count == meta.num_rows:
+        dataset = None
+    elif dataset_stats.null_count == 0 and dataset_stats.has_min_max and dataset_stats.min == dataset_stats.max:
+        dataset = dataset_stats.min
+    else:
+        return None
+    return dataset, {c: stats[c].null_count for c in feature_columns}
+
+
+def read_row_group(pf, rg: int, columns: list = None):
+    table = pf.read_row_group(rg, columns=columns)
+    #categorical dataset columns come back dictionary encoded, group on the plain values
+    dataset_type = table.schema.field('dataset').type
+    if pa.types.is_dictionary(dataset_type):
+        idx = table.schema.get_field_index('dataset')
+        table = table.set_column(idx, 'dataset', pc.cast(table['dataset'], dataset_type.value_type))
+    return table
+
+
+#null counts per dataset with a hash aggregation on the arrow table
+#returns (dataset, row count, {column: null count}) for each dataset in the table
+def count_table_by_dataset(table, feature_columns: list) -> list:
+    aggs = [(c, 'count', pc.CountOptions(mode='only_null')) for c in feature_columns]
+    aggs.append(([], 'count_all'))
+    grouped = table.group_by('dataset').aggregate(aggs).to_pydict()
+    
+    results = []
+    for i, dataset in enumerate(grouped['dataset']):
+        counts = {c: grouped[f"{c}_count"][i] for c in feature_columns}
+        results.append((dataset, grouped['count_all'][i], counts))
+    return results
+
+
+#null counts for every column of every dataset, read row group by row group
+#returns row totals and {column: null count} keyed by dataset (None for rows outside of datasets)
+def count_missing_by_dataset(file_path: str) -> tuple:
+    pf = pq.ParquetFile(file_path)
+    columns = pf.schema_arrow.names
+    feature_columns = [c for c in columns if c != 'dataset']
+    
+    totals = {None: 0}
+    missing_counts = {None: dict.fromkeys(columns, 0)}
+    
+    for rg in range(pf.num_row_groups):
+        single = single_dataset_counts(pf.metadata.row_group(rg), columns, feature_columns)
+        if single is not None:
+            add_counts(totals, missing_counts, columns, single[0], pf.metadata.row_group(rg).num_rows, single[1])
+            continue
+        
+        for dataset, total_count, counts in count_table_by_dataset(read_row_group(pf, rg), feature_columns):
+            add_counts(totals, missing_counts, columns, dataset, total_count, counts)
+    
+    return totals, missing_counts
+
+
+#same output as count_missing_by_dataset, but mixed row groups are sampled per dataset
+#single dataset row groups are still exact from the statistics, and features whose
+#confidence interval straddles a threshold are counted exactly over the unsampled row groups
+#whole row groups are sampled, so the intervals treat each one as a cluster (see sampling.cluster_interval)
+#also returns {dataset: {feature: (ci_low, ci_high)}} percent missing for the counts that are estimates
+def estimate_missing_by_dataset(file_path: str, high_threshold: int, low_threshold: int, sample_rows: int = 200000, confidence: float = 0.99, seed: int = 0) -> tuple:
+    pf = pq.ParquetFile(file_path)
+    columns = pf.schema_arrow.names
+    feature_columns = [c for c in columns if c != 'dataset']
+    
+    totals = {None: 0}
+    missing_counts = {None: dict.fromkeys(columns, 0)}
+    
+    mixed = []
+    for rg in range(pf.num_row_groups):
+        single = single_dataset_counts(pf.metadata.row_group(rg), columns, feature_columns)
+        if single is not None:
+            add_counts(totals, missing_counts, columns, single[0], pf.metadata.row_group(rg).num_rows, single[1])
+        else:
+            mixed.append(rg)
+    
+    if not mixed:
+        return totals, missing_counts, {}
+    
+    #rows per dataset in each mixed row group, only the dataset column is decoded
+    mixed_rows = {}
+    for rg in mixed:
+        grouped = read_row_group(pf, rg, ['dataset']).group_by('dataset').aggregate([([], 'count_all')]).to_pydict()
+        mixed_rows[rg] = dict(zip(grouped['dataset'], grouped['count_all']))
+    
+    #random row groups until the budget is spent, plus any needed so every dataset gets sampled
+    rng = np.random.default_rng(seed)
+    sampled = set()
+    covered = set()
+    sampled_rows = 0
+    for rg in rng.permutation(mixed):
+        rg = int(rg)
+        if sampled_rows < sample_rows or set(mixed_rows[rg]) - covered:
+            sampled.add(rg)
+            covered.update(mixed_rows[rg])
+            sampled_rows += sum(mixed_rows[rg].values())
+    unsampled = [rg for rg in mixed if rg not in sampled]
+    
+    #each sampled row group is one cluster of rows for the dataset's confidence intervals
+    sample_clusters = {}
+    for rg in sorted(sampled):
+        for dataset, total_count, counts in count_table_by_dataset(read_row_group(pf, rg), feature_columns):
+            add_counts(totals, missing_counts, columns, dataset, total_count, counts)
+            sample_clusters.setdefault(dataset, []).append((total_count, counts))
+    
+    unsampled_totals = {}
+    for rg in unsampled:
+        for dataset, rows in mixed_rows[rg].items():
+            unsampled_totals[dataset] = unsampled_totals.get(dataset, 0) + rows
+    
+    #everything that is known exactly so far is already in missing_counts, the unsampled rows get estimated
+    z = z_score(confidence)
+    straddling = {}
+    estimates = {}
+    intervals = {}
+    for dataset, unsampled_count in unsampled_totals.items():
+        total_count = totals[dataset] + unsampled_count
+        cluster_rows = [rows for rows, _ in sample_clusters[dataset]]
+        sample_count = sum(cluster_rows)
+        estimates[dataset] = {}
+        intervals[dataset] = {}
+        for feature in feature_columns:
+            known = missing_counts[dataset][feature]
+            cluster_missing = [counts[feature] for _, counts in sample_clusters[dataset]]
+            k = sum(cluster_missing)
+            lower, upper = cluster_interval(cluster_missing, cluster_rows, z)
+            lower_count = known + lower * unsampled_count
+            upper_count = known + upper * unsampled_count
+            
+            if straddles(lower_count / total_count * 100, upper_count / total_count * 100, low_threshold, high_threshold) or lower_count <= low_threshold < upper_count:
+                straddling.setdefault(dataset, []).append(feature)
+            else:
+                estimates[dataset][feature] = round(k / sample_count * unsampled_count)
+                intervals[dataset][feature] = (round(lower_count / total_count * 100, 2), round(upper_count / total_count * 100, 2))
+    
+    exact_features = sorted({f for features in straddling.values() for f in features}, key=feature_columns.index)
+    if exact_features:
+        for rg in unsampled:
+            table = read_row_group(pf, rg, ['dataset'] + exact_features)
+            for dataset, _, counts in count_table_by_dataset(table, exact_features):
+                for feature in straddling.get(dataset, []):
+                    estimates[dataset][feature] = estimates[dataset].get(feature, 0) + counts[feature]
+    
+    for dataset, unsampled_count in unsampled_totals.items():
+        add_counts(totals, missing_counts, columns, dataset, unsampled_count, estimates[dataset])
+    
+    return totals, missing_counts, intervals
+
+
+#reads only the requested columns for one dataset (None for rows outside of datasets)
+def read_dataset_columns(file_path: str, dataset, columns: list) -> pd.DataFrame:
+    source = pads.dataset(file_path, format='parquet')
+    if dataset is None:
+        expr = pc.field('dataset').is_null()
+    else:
+        expr = pc.field('dataset') == dataset
+    return source.to_table(columns=columns, filter=expr).to_pandas()
+
+
+#percentages and threshold decisions for every (dataset, feature) pair at once, from the grouped counts
+#reported rows go in the report, gpkg rows sit between the thresholds and included rows are below high
+#rows are in dataset order, then by percent missing (highest first), then column order
+#intervals from estimate_missing_by_dataset mark the estimated pairs and give their ci_low and ci_high
+def evaluate_thresholds(totals: dict, missing_counts: dict, datasets: list, high_threshold: int, low_threshold: int, intervals: dict = {}) -> pd.DataFrame:
+    columns = list(missing_counts[datasets[0]])
+    counts = np.array([[missing_counts[d][c] for c in columns] for d in datasets], dtype=np.int64).reshape(len(datasets), len(columns))
+    total = np.array([totals[d] for d in datasets], dtype=np.int64)[:, None]
+    
+    #python's round, the same rounding as Create_Report and sampling.straddles
+    percent = np.array([[round((c / t) * 100, 2) if t else 0 for c in row] for row, t in zip(counts.tolist(), total.ravel().tolist())],
+                       dtype=np.float64).reshape(counts.shape)
+    
+    frame = pd.DataFrame({
+        'order': np.repeat(np.arange(len(datasets)), len(columns)),
+        'dataset': np.repeat(np.array(['none' if d is None else d for d in datasets], dtype=object), len(columns)),
+        'feature': np.tile(columns, len(datasets)),
+        'percent_missing': percent.ravel(),
+        'missing_count': counts.ravel(),
+        'total_count': np.repeat(total.ravel(), len(columns)),
+    })
+    frame['reported'] = frame['missing_count'] > low_threshold
+    frame['gpkg'] = (frame['percent_missing'] > low_threshold) & (frame['percent_missing'] < high_threshold)
+    frame['included'] = frame['percent_missing'] < high_threshold
+    
+    bounds = [intervals.get(d, {}).get(f) for d in datasets for f in columns]
+    frame['approximate'] = [b is not None for b in bounds]
+    frame['ci_low'] = [b[0] if b else None for b in bounds]
+    frame['ci_high'] = [b[1] if b else None for b in bounds]
+    
+    return frame.sort_values(['order', 'percent_missing'], ascending=[True, False], kind='stable')
+
+#reverses rename and some math transforms in the config to get the original client names
+def create_reverse_name_dict(file_path: str) -> dict:
+    return ConfigIndex.from_config(file_path).feature_to_client
+
+
+#writes the per dataset statistics in one go for automated consumers
+def write_stats(stats_rows: pd.DataFrame, output_formats: list, report_dir: str = 'report') -> None:
+    if 'json' not in output_formats and 'parquet' not in output_formats:
+        return
+    
+    columns = ['dataset', 'feature', 'client_name', 'table_name', 'percent_missing', 'missing_count', 'total_count', 'included', 'approximate', 'ci_low', 'ci_high']
+    stats = pd.DataFrame(stats_rows, columns=columns)
+    if 'json' in output_formats:
+        stats.to_json(os.path.join(report_dir, 'missing_values.json'), orient='records', indent=2)
+    if 'parquet' in output_formats:
+        stats.to_parquet(os.path.join(report_dir, 'missing_values.parquet'), index=False)
+
+
+#run this with the intermediate file as input
+#output_formats takes any of 'pdf', 'json' and 'parquet'
+#timings_path dumps the per stage timings as json, see instrumentation.py
+#approximate samples the mixed row groups and only counts exactly near the thresholds
+#config_index is a compiled ConfigIndex, when given the config file isn't read
+def create_missing_features_report(file_path: str, config: str, high_threshold: int, low_threshold: int, create_shp: bool = False, output_formats: list = ['pdf'], timings_path: str = None, report_dir: str = 'report', approximate: bool = False, sample_rows: int = 200000, tile_size: float = None, config_index: ConfigIndex = None) -> None:
+    
+    os.makedirs(report_dir, exist_ok=True)
+    pdf_data_list = []
+    #timings_path only gets the stages of this report
+    instrumentation.reset()
+    
+    if config_index is None:
+        revserse_name_dict = create_reverse_name_dict(config)
+    else:
+        revserse_name_dict = config_index.feature_to_client
+    
+    with instrumentation.stage('null_profiling') as s:
+        if approximate:
+            totals, missing_counts, intervals = estimate_missing_by_dataset(file_path, high_threshold, low_threshold, sample_rows)
+        else:
+            totals, missing_counts = count_missing_by_dataset(file_path)
+            intervals = {}
+        s['rows'] = sum(totals.values())
+    
+    #named datasets in order, then rows outside of datasets
+    datasets = sorted(d for d in totals if d is not None) + [None]
+    sections = []
+    
+    #every decision below comes from this one frame, so the work doesn't grow with a pass per dataset
+    thresholds = evaluate_thresholds(totals, missing_counts, datasets, high_threshold, low_threshold, intervals)
+    reported = thresholds[thresholds['reported']]
+    
+    stats_rows = reported.copy()
+    stats_rows['client_name'] = stats_rows['feature'].map(lambda f: revserse_name_dict.get(f, [None, None])[0])
+    stats_rows['table_name'] = stats_rows['feature'].map(lambda f: revserse_name_dict.get(f, [None, None])[1])
+    
+    #gpkg layers keep the parquet's column order
+    gpkg_by_dataset = thresholds[thresholds['gpkg']].sort_index().groupby('order')['feature'].agg(list).to_dict()
+    reported_by_dataset = dict(tuple(reported.groupby('order', sort=False)))
+
+    for order, dataset in enumerate(datasets):
+        label = 'none' if dataset is None else dataset
+        sections.append(label)
+        print(label)
+        dataset_specific_list = [["Feature", "Table Name", "Missing"]]
+        
+        rows = reported_by_dataset.get(order, reported.iloc[:0])
+        perc_missing_dict = list(zip(rows['feature'], rows['percent_missing'], rows['approximate']))
+        gpkg_features = gpkg_by_dataset.get(order, [])
+        
+        #only decode coordinates for datasets that need a shapefile
+        if create_shp and gpkg_features:
+            columns = list(dict.fromkeys(['latitude', 'longitude'] + gpkg_features))
+            with instrumentation.stage('parquet_load', dataset=label) as s:
+                df = read_dataset_columns(file_path, dataset, columns)
+                s['rows'] = len(df)
+            with instrumentation.stage('gpkg_write', dataset=label, rows=len(df), layers=len(gpkg_features)):
+                create_gpkg(df, label, gpkg_features, report_dir, tile_size)
+            for feature in gpkg_features:
+                print(f"GPKG created for {label} - {feature}")
+        
+        print("\nFeatures missing by percent:")
+        not_included = rows.loc[~rows['included'], 'feature'].tolist()
+        
+        #estimated percentages are marked with ~, their intervals are in the stats output
+        for feature, percent, estimated in perc_missing_dict:
+            if percent >= high_threshold:
+                continue
+            marker = "~" if estimated else ""
+            print(f"{feature}: {marker}{percent}")
+             
+            #------------CHANGE THIS BACK TO INCLUDE OUR INERNAL STUFF
+            #convert feature name back to client name system if applicable and add to data list
+            #feature_name_in_list = revserse_name_dict.get(feature, f"{feature} [X]")
+            if feature in revserse_name_dict.keys():
+                dataset_specific_list.append([revserse_name_dict[feature][0], revserse_name_dict[feature][1], f"{marker}{percent}%"])
+        
+        pdf_data_list.append(dataset_specific_list)
+            
+        print("\nFeatures not included in this dataset:")
+        for i in not_included:
+            print(i)
+        print("\n")
+    
+    #export info to pdf
+    if 'pdf' in output_formats:
+        with instrumentation.stage('pdf_build', rows=sum(len(d) - 1 for d in pdf_data_list)):
+            export_to_pdf(pdf_data_list, sections, os.path.join(report_dir, 'condominiums_report.pdf'), estimated=bool(intervals))
+    
+    with instrumentation.stage('stats_write', rows=len(stats_rows)):
+        write_stats(stats_rows, output_formats, report_dir)
+    
+    if timings_path:
+        instrumentation.dump_json(timings_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Missing value report per dataset for an intermediate parquet file")
+    parser.add_argument('file_path', help="intermediate parquet file")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--config-index', help="compiled index from python -m data_processing_tools.config_index, used instead of --config")
+    parser.add_argument('--high', type=int, default=100)
+    parser.add_argument('--low', type=int, default=0)
+    parser.add_argument('--shp', action='store_true', help="write a GeoPackage of missing rows per dataset")
+    parser.add_argument('--report-dir', default='report')
+    parser.add_argument('--formats', nargs='+', default=['pdf'], choices=['pdf', 'json', 'parquet'])
+    parser.add_argument('--timings', help="write stage timings to this json file")
+    parser.add_argument('--approximate', action='store_true', help="sample instead of counting every row")
+    parser.add_argument('--sample-rows', type=int, default=200000)
+    parser.add_argument('--tile-size', type=float, help="add an overview layer of missing counts on a grid of this many degrees")
+    args = parser.parse_args()
+
+    config_index = ConfigIndex.load(args.config_index) if args.config_index else None
+    create_missing_features_report(args.file_path, args.config, args.high, args.low, args.shp, args.formats, args.timings, args.report_dir, args.approximate, args.sample_rows, args.tile_size, config_index)
+
+
+if __name__ == '__main__':
+    main()
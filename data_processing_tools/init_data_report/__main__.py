@@ -0,0 +1,3 @@
+from .init_data_report import main
+
+main()
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+#rows multiplied per block, float32 sums stay exact well below 2**24
+BLOCK_ROWS = 65536
+
+
+#feature x feature co-missingness and missing-pattern frequencies for one document
+#matrix[i][j] is the number of rows missing both feature i and feature j (the diagonal is the null count)
+#patterns maps a row's packed null bitmap to how many rows share it
+class CoMissing():
+
+    def __init__(self, features: list):
+        self.features = list(features)
+        self.matrix = np.zeros((len(self.features), len(self.features)), dtype=np.int64)
+        self.patterns = {}
+        self.rows = 0
+
+
+    #adds a boolean isna() frame with the same columns as features
+    def add(self, nulls) -> None:
+        values = nulls[self.features].to_numpy(dtype=np.uint8)
+        self.rows += len(values)
+
+        for start in range(0, len(values), BLOCK_ROWS):
+            block = values[start:start + BLOCK_ROWS].astype(np.float32)
+            self.matrix += (block.T @ block).astype(np.int64)
+
+        #one packed bitmap per row, identical rows collapse to one pattern
+        packed = np.ascontiguousarray(np.packbits(values, axis=1))
+        if packed.shape[1] == 0:
+            return
+        rows = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        unique, counts = np.unique(rows, return_counts=True)
+        for pattern, count in zip(unique, counts):
+            key = pattern.tobytes()
+            self.patterns[key] = self.patterns.get(key, 0) + int(count)
+
+
+    def merge(self, other) -> None:
+        self.matrix += other.matrix
+        self.rows += other.rows
+        for key, count in other.patterns.items():
+            self.patterns[key] = self.patterns.get(key, 0) + count
+
+
+    def pattern_features(self, key: bytes) -> list:
+        bits = np.unpackbits(np.frombuffer(key, dtype=np.uint8))[:len(self.features)]
+        return [f for f, bit in zip(self.features, bits) if bit]
+
+
+    #most common patterns that miss at least one feature, as [features missing, row count]
+    def top_patterns(self, n: int = 10) -> list:
+        patterns = []
+        for key, count in sorted(self.patterns.items(), key=lambda item: -item[1]):
+            features = self.pattern_features(key)
+            if not features:
+                continue
+            patterns.append([features, count])
+            if len(patterns) == n:
+                break
+        return patterns
+
+
+    def to_dict(self, top: int = 10) -> dict:
+        return {
+            'features': self.features,
+            'rows': self.rows,
+            'matrix': self.matrix.tolist(),
+            'top_patterns': [{'missing': features, 'rows': count} for features, count in self.top_patterns(top)],
+        }
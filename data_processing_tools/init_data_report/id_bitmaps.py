@@ -0,0 +1,109 @@
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+
+#missing ids per feature stored as packed bitmaps over one shared id dictionary
+#each id string is interned once and gets an integer code, a feature's set is the bits at those codes
+class IdBitmaps():
+
+    def __init__(self):
+        self.codes = {}
+        self.bitmaps = {}
+        #id strings by code, extended as the dictionary grows
+        self.id_values = np.empty(0, dtype=object)
+
+
+    def __contains__(self, key) -> bool:
+        return key in self.bitmaps
+
+
+    def __iter__(self):
+        return iter(self.bitmaps)
+
+
+    def __len__(self) -> int:
+        return len(self.bitmaps)
+
+
+    #interns new ids and returns the code of every id passed in
+    def encode(self, ids) -> np.ndarray:
+        codes = self.codes
+        return np.fromiter((codes.setdefault(i, len(codes)) for i in ids), dtype=np.int64, count=len(ids))
+
+
+    #codes for ids without interning them, -1 where an id was never seen
+    def lookup(self, ids) -> np.ndarray:
+        codes = self.codes
+        return np.fromiter((codes.get(i, -1) for i in ids), dtype=np.int64, count=len(ids))
+
+
+    #bitmap for a key padded to the current dictionary size
+    def bitmap(self, key) -> np.ndarray:
+        size = (len(self.codes) + 7) // 8
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            bitmap = np.zeros(size, dtype=np.uint8)
+        elif len(bitmap) < size:
+            bitmap = np.concatenate([bitmap, np.zeros(size - len(bitmap), dtype=np.uint8)])
+        self.bitmaps[key] = bitmap
+        return bitmap
+
+
+    def add(self, key, ids) -> None:
+        ids = pd.unique(np.asarray(ids, dtype=object))
+        ids = ids[pd.notna(ids)]
+        self.add_codes(key, self.encode(ids))
+
+
+    #sets bits for codes that were already interned with encode()
+    def add_codes(self, key, codes: np.ndarray) -> None:
+        bitmap = self.bitmap(key)
+        np.bitwise_or.at(bitmap, codes >> 3, (128 >> (codes & 7)).astype(np.uint8))
+
+
+    def copy(self, source, key) -> None:
+        self.bitmaps[key] = self.bitmap(source).copy()
+
+
+    #bool mask over the dictionary codes for a key
+    def mask(self, key) -> np.ndarray:
+        return np.unpackbits(self.bitmap(key))[:len(self.codes)].astype(bool)
+
+
+    #codes are only ever appended, so only ids interned since the last call are copied over
+    def id_array(self) -> np.ndarray:
+        if len(self.id_values) < len(self.codes):
+            new_ids = np.empty(len(self.codes) - len(self.id_values), dtype=object)
+            new_ids[:] = list(islice(self.codes, len(self.id_values), None))
+            self.id_values = np.concatenate([self.id_values, new_ids])
+        return self.id_values
+
+
+    def ids(self, key) -> list:
+        return self.id_array()[self.mask(key)].tolist()
+
+
+    #for codes from lookup(), which of them are set for a key
+    def contains(self, key, codes: np.ndarray) -> np.ndarray:
+        mask = self.mask(key)
+        found = np.zeros(len(codes), dtype=bool)
+        known = codes >= 0
+        found[known] = mask[codes[known]]
+        return found
+
+
+    #unions another IdBitmaps into this one, remapping its codes onto this dictionary
+    #keys optionally maps which of the other's keys to take and what to call them here
+    def merge(self, other, keys: dict = None) -> None:
+        if not other.codes:
+            return
+        remap = self.encode(list(other.codes))
+
+        if keys is None:
+            keys = {key: key for key in other}
+        for other_key, key in keys.items():
+            if other_key not in other:
+                continue
+            self.add_codes(key, remap[np.flatnonzero(other.mask(other_key))])
@@ -0,0 +1,770 @@
+import argparse
+import numpy as np
+import pandas as pd
+import glob
+import hashlib
+import io
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from .id_bitmaps import IdBitmaps
+from .co_missing import CoMissing
+from .. import instrumentation
+from ..config_index import ConfigIndex
+from ..sampling import z_score, wilson_interval, straddles
+from ..spatial_overview import tile_layer, simplified, TILE_LAYER
+
+#values read_csv treats as missing by default, so rows that never went through a csv
+#are profiled the same way as the csv would have been
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+class Create_Report():
+    
+    def __init__(self, high: int = 100, low: int = 0, additonal_primary: list = [], additional_secondary: list = [], gpkg_path: str = None, gpkg_id: str = None, max_memory_mb: int = None, workers: int = 1, cache_dir: str = None, output_formats: list = ['pdf'], timings_path: str = None, config_path: str = 'config.json', report_dir: str = 'report', logo_path: str = 'logos/test.png', approximate: bool = False, sample_rows: int = 20000, confidence: float = 0.99, co_missing: bool = False, top_patterns: int = 10, tile_size: float = None, simplify_tolerance: float = None, config_index: ConfigIndex = None):
+
+        primary_fields = [
+            "key_primary",
+            "area_land_sqft",
+            "area_finished_sqft",
+            "sale_date",
+            "valid_sale",
+            "sale_price",
+            "model_customer_value",
+            "model_customer_land_value",
+            "model_customer_impr_value",
+            "building_quality_score",
+            "building_quality_desc",
+            "building_condition_score",
+            "building_condition_desc",
+            "neighborhood",
+            "school_district",
+            "is_residential",
+            "zip",
+            "building_year_built",
+            "building_effective_age_years",
+            "city"
+        ]
+
+        secondary_fields = [
+            "heat_type_desc",
+            "area_garage_sqft",
+            "garage_style_desc",
+            "area_basement_sqft",
+            "zoning",
+            "district",
+            "area_garage_sqft",
+            "structure_type",
+            "residence_type",
+            "rooms_bed",
+            "rooms_full_bath",
+            "rooms_half_bath"
+        ]
+        
+        self.high = high
+        self.low = low
+        
+        self.primary_fields = primary_fields + additonal_primary
+        self.secondary_fields = secondary_fields + additional_secondary
+        
+        self.gpkg_path = gpkg_path
+        self.gpkg_id = gpkg_id
+        
+        #optional overview layers in the gpkg, both in the units of the reference file's crs
+        #tile_size adds a grid of missing counts per feature, simplify_tolerance a simplified copy of each layer
+        self.tile_size = tile_size
+        self.simplify_tolerance = simplify_tolerance
+        
+        #when set, csvs are streamed in chunks of roughly this many MB
+        self.max_memory_mb = max_memory_mb
+        
+        #number of processes used to profile csv files, 1 keeps it sequential
+        self.workers = workers
+        
+        #per file profiles are reused from here while the file and config are unchanged
+        self.cache_dir = cache_dir
+        
+        #any of 'pdf', 'json' and 'parquet', the pdf can be skipped when only the numbers are needed
+        self.output_formats = output_formats
+        
+        #stage timings are dumped here as json when set, see instrumentation.py
+        self.timings_path = timings_path
+        
+        #approximate mode profiles a sample of each csv and only counts exactly
+        #the features whose confidence interval straddles low or high
+        self.approximate = approximate
+        self.sample_rows = sample_rows
+        self.confidence = confidence
+        
+        #per document co-missingness matrix and most common missing patterns, see co_missing.py
+        self.track_co_missing = co_missing
+        self.top_patterns = top_patterns
+        
+        self.config_path = config_path
+        self.report_dir = report_dir
+        self.logo_path = logo_path
+        
+        #a compiled index (e.g. ConfigIndex.load or one shared across a batch) skips parsing config_path
+        if config_index is None:
+            config_index = ConfigIndex.from_config(self.config_path)
+        self.index = config_index.with_groups(self.primary_fields, self.secondary_fields)
+        self.rename_dict = self.reverse_name()
+        self.reset()
+    
+    
+    #clears the profiled results so the same instance can serve another report
+    #stage timings are cleared too, so timings_path only gets this report's stages
+    def reset(self) -> None:
+        instrumentation.reset()
+        self.missing_dict = {}
+        self.missing_ids_by_feature = IdBitmaps()
+        self.feature_hash = {}
+        self.file_counts = {}
+        self.co_missing = {}
+        #(ci_low, ci_high) percent missing for features that were estimated from a sample
+        self.intervals = {}
+    
+    
+    #client column -> feature name from the compiled config index
+    def reverse_name(self):
+        return self.index.client_to_feature
+            
+
+    def create_gpkg(self, report_dir: str) -> None:
+        import geopandas as gpd
+        
+        #only the id and geometry are needed to build the layers
+        with instrumentation.stage('gpkg_load') as s:
+            gdf = gpd.read_file(self.gpkg_path, columns=[self.gpkg_id])
+            s['rows'] = len(gdf)
+
+        #read in ids as strings and map them onto the interned id codes once
+        id_codes = self.missing_ids_by_feature.lookup(gdf[self.gpkg_id].astype(str).to_numpy())
+        
+        gpkg_file = os.path.join(report_dir, "missing_values.gpkg")
+        tile_masks = {}
+        
+        #compare against missing ids to form new gpkg
+        for hash in self.missing_ids_by_feature:
+            
+            feature = self.feature_hash[hash]
+            
+            # Resolve ids to row positions, keeping the reference file's order
+            contains = self.missing_ids_by_feature.contains(hash, id_codes)
+            filtered_gdf = gdf.take(np.flatnonzero(contains))
+            
+            layer_name = f"{feature[0]} - {feature[1]}"
+            with instrumentation.stage('gpkg_write', layer=layer_name) as s:
+                filtered_gdf.to_file(gpkg_file, layer=layer_name, driver="GPKG", SPATIAL_INDEX="YES")
+                s['rows'] = len(filtered_gdf)
+            
+            if self.simplify_tolerance:
+                with instrumentation.stage('gpkg_simplify', layer=layer_name, rows=len(filtered_gdf)):
+                    simplified(filtered_gdf, self.simplify_tolerance).to_file(gpkg_file, layer=f"{layer_name} (simplified)", driver="GPKG", SPATIAL_INDEX="YES")
+            
+            if self.tile_size:
+                tile_masks[layer_name] = contains
+        
+        if tile_masks:
+            with instrumentation.stage('gpkg_tiles', rows=len(gdf), layers=len(tile_masks)):
+                tile_layer(gdf.geometry, tile_masks, self.tile_size).to_file(gpkg_file, layer=TILE_LAYER, driver="GPKG", SPATIAL_INDEX="YES")
+
+
+    def process_missing(self, df: pd.DataFrame, file_name: str) -> None: 
+        total_count = len(df)
+        tracked = self.rename_dict.keys()
+        
+        #count nulls for all tracked columns in one pass
+        with instrumentation.stage('null_profiling', file=file_name, rows=total_count):
+            features = [f for f in df.columns if f in tracked]
+            nulls = df[features].isna()
+            missing_counts = nulls.sum()
+            if self.track_co_missing:
+                self.add_co_missing(nulls, file_name)
+            flagged = self.record_missing(missing_counts, total_count, file_name)
+        
+        with instrumentation.stage('id_collection', file=file_name, rows=total_count):
+            self.collect_missing_ids(df, flagged, file_name)
+    
+    
+    #stores the percentages for one file, returns the features that fall between low and high
+    def record_missing(self, missing_counts: pd.Series, total_count: int, file_name: str) -> list:
+        flagged = []
+        self.file_counts[file_name] = [total_count, {f: int(c) for f, c in missing_counts.items()}]
+        
+        for feature, missing_count in missing_counts.items():
+            
+            hash = feature + file_name
+            
+            self.feature_hash[hash] = [feature, file_name]
+            
+            group = self.index.group(feature)
+            
+            self.missing_dict[hash] = [0, group]
+            
+            percent_missing = round((int(missing_count)/total_count) * 100, 2)
+            if self.low < percent_missing < self.high:
+                self.missing_dict[hash][0] = percent_missing
+                flagged.append(feature)
+        
+        return flagged
+    
+    
+    #finds the csv column that holds the primary key
+    def key_column(self, columns) -> str:
+        for ck_name in self.index.key_columns:
+            if ck_name in columns:
+                return ck_name
+        return None
+    
+    
+    #steps to prep data for shapefile output
+    def collect_missing_ids(self, df: pd.DataFrame, features: list, file_name: str) -> None:
+        if not (self.gpkg_path and self.gpkg_id) or not features:
+            return
+        
+        csv_key_name = self.key_column(df.columns)
+        if csv_key_name is None:
+            return
+        
+        for feature in features:
+            hash = feature + file_name
+            
+            #only pull the key column for the missing rows
+            self.missing_ids_by_feature.add(hash, df.loc[df[feature].isna(), csv_key_name].to_numpy())
+    
+    
+    #rows per chunk so a chunk of the pruned columns stays under max_memory_mb
+    def chunk_rows(self, csv: str, usecols) -> int:
+        sample = pd.read_csv(csv, dtype=str, usecols=usecols, nrows=1000)
+        if sample.empty:
+            return 1000
+        
+        bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+        return max(int(self.max_memory_mb * 1024 * 1024 / bytes_per_row), 1)
+    
+    
+    #same numbers as process_missing but reads the csv in bounded chunks
+    def process_missing_chunked(self, csv: str, file_name: str) -> None:
+        tracked = self.rename_dict.keys()
+        usecols = lambda c: c in tracked
+        chunksize = self.chunk_rows(csv, usecols)
+        
+        total_count = 0
+        missing_counts = None
+        with instrumentation.stage('null_profiling', file=file_name, chunked=True) as s:
+            for chunk in pd.read_csv(csv, dtype=str, usecols=usecols, chunksize=chunksize):
+                total_count += len(chunk)
+                nulls = chunk.isna()
+                counts = nulls.sum()
+                if self.track_co_missing:
+                    self.add_co_missing(nulls, file_name)
+                missing_counts = counts if missing_counts is None else missing_counts.add(counts, fill_value=0)
+            s['rows'] = total_count
+        
+        if missing_counts is None:
+            return
+        
+        flagged = self.record_missing(missing_counts, total_count, file_name)
+        if not (self.gpkg_path and self.gpkg_id) or not flagged:
+            return
+        
+        #second pass only over the key and flagged columns to gather ids
+        csv_key_name = self.key_column(missing_counts.index)
+        if csv_key_name is None:
+            return
+        
+        self.collect_missing_ids_chunked(csv, file_name, flagged, csv_key_name, chunksize)
+    
+    
+    #chunks can be missing columns the header has, so every document keeps one fixed feature order
+    def add_co_missing(self, nulls: pd.DataFrame, file_name: str) -> None:
+        if file_name not in self.co_missing:
+            self.co_missing[file_name] = CoMissing(sorted(nulls.columns))
+        with instrumentation.stage('co_missing', file=file_name, rows=len(nulls)):
+            self.co_missing[file_name].add(nulls)
+    
+    
+    def collect_missing_ids_chunked(self, csv: str, file_name: str, flagged: list, csv_key_name: str, chunksize: int) -> None:
+        id_cols = [csv_key_name] + [f for f in flagged if f != csv_key_name]
+        with instrumentation.stage('id_collection', file=file_name, chunked=True):
+            for chunk in pd.read_csv(csv, dtype=str, usecols=id_cols, chunksize=chunksize):
+                self.collect_missing_ids(chunk, flagged, file_name)
+    
+    
+    #picks every data line with the same probability in one pass over the raw bytes, returns the sample and the row count
+    #reading blocks after random byte offsets favoured rows that follow long lines (nulls make lines short)
+    #and neighbouring lines tend to miss together, independently picked rows are what the wilson interval assumes
+    #returns None for small files, where counting exactly is just as fast
+    def sample_csv(self, csv: str, usecols, chunk_bytes: int = 1 << 24) -> tuple:
+        size = os.path.getsize(csv)
+        rng = np.random.default_rng(0)
+        
+        with open(csv, "rb") as f:
+            header = f.readline()
+            data_start = f.tell()
+            head = [f.readline() for _ in range(50)]
+            bytes_per_line = max(sum(len(line) for line in head) / max(len([l for l in head if l]), 1), 1)
+            
+            estimated_rows = int((size - data_start) / bytes_per_line)
+            if estimated_rows <= self.sample_rows * 2:
+                return None, estimated_rows
+            rate = self.sample_rows / estimated_rows
+            
+            f.seek(data_start)
+            lines = []
+            row_count = 0
+            #the start of a line that runs over into the next chunk
+            carry = b""
+            for chunk in iter(lambda: f.read(chunk_bytes), b""):
+                data = np.frombuffer(chunk, dtype=np.uint8)
+                ends = np.flatnonzero(data == ord("\n"))
+                if len(ends) == 0:
+                    carry += chunk
+                    continue
+                starts = np.concatenate(([0], ends[:-1] + 1))
+                
+                #read_csv skips blank lines, so they aren't rows here either
+                lengths = ends - starts
+                rows = (lengths > 1) | ((lengths == 1) & (data[starts] != ord("\r")))
+                rows[0] |= bool(carry)
+                row_count += int(rows.sum())
+                
+                for i in np.flatnonzero(rows & (rng.random(len(ends)) < rate)):
+                    line = chunk[starts[i]:ends[i] + 1]
+                    lines.append(carry + line if i == 0 else line)
+                carry = chunk[ends[-1] + 1:]
+            
+            if carry.strip():
+                row_count += 1
+                if rng.random() < rate:
+                    lines.append(carry + b"\n")
+        
+        if not lines:
+            return None, row_count
+        
+        sample_bytes = header + b"".join(lines)
+        return pd.read_csv(io.BytesIO(sample_bytes), dtype=str, usecols=usecols), row_count
+    
+    
+    #estimates null counts from a sample, counting exactly only where the interval straddles a threshold
+    def process_missing_approximate(self, csv: str, file_name: str) -> bool:
+        tracked = self.rename_dict.keys()
+        usecols = lambda c: c in tracked
+        
+        with instrumentation.stage('sample_profiling', file=file_name) as s:
+            sample, total_count = self.sample_csv(csv, usecols)
+            if sample is None:
+                return False
+            s['rows'] = len(sample)
+        
+        n = len(sample)
+        z = z_score(self.confidence)
+        sample_missing = sample.isna().sum()
+        
+        exact_features = []
+        estimates = {}
+        intervals = {}
+        for feature, k in sample_missing.items():
+            lower, upper = wilson_interval(int(k), n, z)
+            if straddles(lower * 100, upper * 100, self.low, self.high):
+                exact_features.append(feature)
+            else:
+                intervals[feature + file_name] = (round(lower * 100, 2), round(upper * 100, 2))
+            estimates[feature] = int(k) / n
+        
+        chunksize = self.chunk_rows(csv, usecols) if self.max_memory_mb else 200000
+        
+        #exact pass over only the straddling columns, which also gives the exact row count
+        exact_counts = {}
+        if exact_features:
+            with instrumentation.stage('null_profiling', file=file_name, chunked=True, columns=len(exact_features)) as s:
+                total_count = 0
+                counts = None
+                for chunk in pd.read_csv(csv, dtype=str, usecols=exact_features, chunksize=chunksize):
+                    total_count += len(chunk)
+                    chunk_counts = chunk.isna().sum()
+                    counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+                if counts is not None:
+                    exact_counts = counts.to_dict()
+                s['rows'] = total_count
+        
+        missing_counts = pd.Series({f: exact_counts[f] if f in exact_counts else round(estimates[f] * total_count) for f in sample_missing.index}, dtype='int64')
+        flagged = self.record_missing(missing_counts, total_count, file_name)
+        self.intervals.update(intervals)
+        
+        if self.gpkg_path and self.gpkg_id and flagged:
+            csv_key_name = self.key_column(missing_counts.index)
+            if csv_key_name is not None:
+                self.collect_missing_ids_chunked(csv, file_name, flagged, csv_key_name, chunksize)
+        return True
+
+
+    #profiles batches of row dicts as they arrive, e.g. placemarks straight out of a kmz
+    #null counts and missing ids for every tracked column are kept as bitmaps until the end,
+    #since which features fall between low and high is only known once every row has been seen
+    def profile_rows(self, batches, file_name: str) -> None:
+        tracked = self.rename_dict.keys()
+        collect_ids = bool(self.gpkg_path and self.gpkg_id)
+        
+        total_count = 0
+        missing_counts = {}
+        #the None key holds every id seen so far
+        missing_ids = IdBitmaps()
+        csv_key_name = None
+        
+        with instrumentation.stage('null_profiling', file=file_name, streamed=True) as s:
+            for rows in batches:
+                df = pd.DataFrame(rows)
+                df = df[[f for f in df.columns if f in tracked]].replace(CSV_NA_VALUES, np.nan)
+                
+                #rows before a column first showed up were missing it
+                for feature in df.columns:
+                    if feature not in missing_counts:
+                        missing_counts[feature] = total_count
+                        if collect_ids:
+                            missing_ids.copy(None, feature)
+                
+                if collect_ids and csv_key_name is None:
+                    csv_key_name = self.key_column(df.columns)
+                
+                if collect_ids and csv_key_name in df.columns:
+                    has_key = df[csv_key_name].notna().to_numpy()
+                    codes = missing_ids.encode(df[csv_key_name].to_numpy()[has_key])
+                    missing_ids.add_codes(None, codes)
+                
+                for feature in missing_counts:
+                    if feature in df.columns:
+                        missing = df[feature].isna().to_numpy()
+                    else:
+                        missing = np.ones(len(df), dtype=bool)
+                    missing_counts[feature] += int(missing.sum())
+                    
+                    if collect_ids and csv_key_name in df.columns:
+                        missing_ids.add_codes(feature, codes[missing[has_key]])
+                
+                total_count += len(df)
+            s['rows'] = total_count
+        
+        if total_count == 0:
+            return
+        
+        flagged = self.record_missing(pd.Series(missing_counts, dtype='int64'), total_count, file_name)
+        if collect_ids:
+            self.missing_ids_by_feature.merge(missing_ids, {f: f + file_name for f in flagged})
+    
+    
+    #reads placemark descriptions from a kmz and profiles them without writing a csv
+    def profile_kmz(self, kmz_path: str, file_name: str = 'Parcels', workers: int = 1, batch_size: int = 10000) -> None:
+        from ..kmz_to_csv.kmz_to_csv import iter_placemarks, iter_parsed_batches
+        
+        batches = (rows for rows, _ in iter_parsed_batches(iter_placemarks(kmz_path), workers, batch_size))
+        self.profile_rows(batches, file_name)
+
+
+    def process_file(self, csv: str) -> None:
+        file_name = os.path.splitext(os.path.basename(csv))[0]
+        
+        if self.cache_dir:
+            key = self.cache_key(csv)
+            profile = self.load_profile(key)
+            if profile is not None:
+                with instrumentation.stage('cache_hit', file=file_name, rows=profile['total_count']):
+                    self.apply_profile(profile, file_name)
+                return
+        
+        #estimates aren't cached, a later exact run should still profile the file
+        if self.approximate and self.process_missing_approximate(csv, file_name):
+            return
+        
+        if self.max_memory_mb:
+            self.process_missing_chunked(csv, file_name)
+        else:
+            with instrumentation.stage('csv_load', file=file_name) as s:
+                df = pd.read_csv(csv, dtype=str)
+                s['rows'] = len(df)
+            self.process_missing(df, file_name)
+        
+        if self.cache_dir and file_name in self.file_counts:
+            self.save_profile(key, self.extract_profile(file_name))
+    
+    
+    #content hash of a csv, the stored hash is reused while size and mtime haven't changed
+    def file_digest(self, csv: str) -> str:
+        stat = os.stat(csv)
+        path_hash = hashlib.sha1(os.path.abspath(csv).encode()).hexdigest()
+        stat_path = os.path.join(self.cache_dir, f"stat-{path_hash}.json")
+        
+        if os.path.exists(stat_path):
+            with open(stat_path, "r") as json_file:
+                entry = json.load(json_file)
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return entry['sha256']
+        
+        digest = hashlib.sha256()
+        with open(csv, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        with open(stat_path, "w") as json_file:
+            json.dump(entry, json_file)
+        return entry['sha256']
+    
+    
+    #changes to the file, the rename mapping or the thresholds all give a new key
+    def cache_key(self, csv: str) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        settings = json.dumps([self.rename_dict, self.low, self.high, bool(self.gpkg_path and self.gpkg_id), self.track_co_missing], sort_keys=True)
+        return hashlib.sha256((self.file_digest(csv) + settings).encode()).hexdigest()
+    
+    
+    def load_profile(self, key: str) -> dict:
+        profile_path = os.path.join(self.cache_dir, f"profile-{key}.pkl")
+        if not os.path.exists(profile_path):
+            return None
+        #profiles pickled by an older layout of the tools can't be loaded, they're profiled again
+        try:
+            with open(profile_path, "rb") as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+    
+    
+    def save_profile(self, key: str, profile: dict) -> None:
+        profile_path = os.path.join(self.cache_dir, f"profile-{key}.pkl")
+        tmp_path = f"{profile_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(profile, f)
+        os.replace(tmp_path, profile_path)
+    
+    
+    #counts and missing ids for one file, independent of the file name
+    def extract_profile(self, file_name: str) -> dict:
+        total_count, missing_counts = self.file_counts[file_name]
+        missing_ids = {}
+        for feature in missing_counts:
+            hash = feature + file_name
+            if hash in self.missing_ids_by_feature:
+                missing_ids[feature] = self.missing_ids_by_feature.ids(hash)
+        return {'total_count': total_count, 'missing_counts': missing_counts, 'missing_ids': missing_ids,
+                'co_missing': self.co_missing.get(file_name)}
+    
+    
+    def apply_profile(self, profile: dict, file_name: str) -> None:
+        self.record_missing(pd.Series(profile['missing_counts'], dtype='int64'), profile['total_count'], file_name)
+        for feature, ids in profile['missing_ids'].items():
+            self.missing_ids_by_feature.add(feature + file_name, ids)
+        if profile.get('co_missing') is not None:
+            self.co_missing[file_name] = profile['co_missing']
+    
+    
+    #what a pool worker needs to profile a file, the worker builds its own report from these
+    #so none of the results profiled so far are pickled with every job
+    def worker_settings(self) -> dict:
+        return {
+            'high': self.high,
+            'low': self.low,
+            'additonal_primary': self.primary_fields,
+            'additional_secondary': self.secondary_fields,
+            'gpkg_path': self.gpkg_path,
+            'gpkg_id': self.gpkg_id,
+            'max_memory_mb': self.max_memory_mb,
+            'cache_dir': self.cache_dir,
+            'approximate': self.approximate,
+            'sample_rows': self.sample_rows,
+            'confidence': self.confidence,
+            'co_missing': self.track_co_missing,
+            'config_index': self.index,
+        }
+    
+    
+    def merge_partial(self, missing_dict: dict, feature_hash: dict, missing_ids_by_feature: IdBitmaps, file_counts: dict, co_missing: dict = {}, intervals: dict = {}, timings: list = []) -> None:
+        instrumentation.extend(timings)
+        self.co_missing.update(co_missing)
+        self.intervals.update(intervals)
+        self.missing_dict.update(missing_dict)
+        self.feature_hash.update(feature_hash)
+        self.file_counts.update(file_counts)
+        self.missing_ids_by_feature.merge(missing_ids_by_feature)
+
+
+    #one row per feature and document, in report order
+    def stats_frame(self) -> pd.DataFrame:
+        rows = []
+        for hash in self.missing_dict:
+            column, file_name = self.feature_hash[hash]
+            total_count, missing_counts = self.file_counts[file_name]
+            missing_count = missing_counts[column]
+            percent_missing = round((missing_count/total_count) * 100, 2)
+            ci_low, ci_high = self.intervals.get(hash, (None, None))
+            rows.append({
+                'feature': self.rename_dict[column],
+                'client_name': column,
+                'document': file_name,
+                'percent_missing': percent_missing,
+                'importance_group': self.missing_dict[hash][1],
+                'missing_count': missing_count,
+                'total_count': total_count,
+                'in_report': self.missing_dict[hash][0] != 0,
+                'approximate': hash in self.intervals,
+                'ci_low': ci_low,
+                'ci_high': ci_high,
+            })
+        
+        columns = ['feature', 'client_name', 'document', 'percent_missing', 'importance_group', 'missing_count', 'total_count', 'in_report',
+                   'approximate', 'ci_low', 'ci_high']
+        return pd.DataFrame(rows, columns=columns)
+    
+    
+    def write_stats(self, report_dir: str, output_formats: list) -> None:
+        if 'json' not in output_formats and 'parquet' not in output_formats:
+            return
+        
+        stats = self.stats_frame()
+        if 'json' in output_formats:
+            stats.to_json(os.path.join(report_dir, 'missing_values.json'), orient='records', indent=2)
+        if 'parquet' in output_formats:
+            stats.to_parquet(os.path.join(report_dir, 'missing_values.parquet'), index=False)
+
+
+    #top missing patterns per document as [document, rows, percent of rows, features missing]
+    def pattern_rows(self) -> list:
+        rows = []
+        for file_name in sorted(self.co_missing):
+            co_missing = self.co_missing[file_name]
+            for features, count in co_missing.top_patterns(self.top_patterns):
+                names = [self.rename_dict[f] for f in features]
+                rows.append([file_name, count, round(100 * count / co_missing.rows, 2), names])
+        return rows
+    
+    
+    #the matrices use feature names, the client column names only matter while reading
+    def write_co_missing(self, report_dir: str) -> None:
+        output = {}
+        for file_name in sorted(self.co_missing):
+            entry = self.co_missing[file_name].to_dict(self.top_patterns)
+            entry['features'] = [self.rename_dict[f] for f in entry['features']]
+            for pattern in entry['top_patterns']:
+                pattern['missing'] = [self.rename_dict[f] for f in pattern['missing']]
+            output[file_name] = entry
+        
+        with open(os.path.join(report_dir, 'co_missing.json'), "w") as json_file:
+            json.dump(output, json_file, indent=2)
+    
+    
+    #profiles the given csv files, adding to whatever has already been profiled
+    def profile(self, paths: list) -> None:
+        #sorted so the report order doesn't depend on the caller or on worker timing
+        csv_files = sorted(paths)
+        
+        if self.workers > 1:
+            settings = self.worker_settings()
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                #map yields in submission order, so merging stays deterministic
+                for partial in pool.map(profile_worker, [settings] * len(csv_files), csv_files):
+                    self.merge_partial(*partial)
+        else:
+            for csv in csv_files:
+                self.process_file(csv)
+    
+    
+    #writes the pdf, stats and gpkg for everything profiled so far
+    def write_outputs(self, report_dir: str = None, output_formats: list = None) -> None:
+        #an explicit empty list writes no formats, only None falls back to the defaults
+        if report_dir is None:
+            report_dir = self.report_dir
+        if output_formats is None:
+            output_formats = self.output_formats
+        os.makedirs(report_dir, exist_ok=True)
+        
+        self.missing_dict = dict(sorted(self.missing_dict.items(), key=lambda item: (item[1][1], -item[1][0])))
+        
+        #get it ready to print and export to pdf
+        pdf_ready_list = []
+        #estimated percentages are marked with ~, their intervals are in the stats output
+        for hash in self.missing_dict:
+            estimated = hash in self.intervals
+            print(self.feature_hash[hash][0], "-", self.feature_hash[hash][1], ":", f'{"~" if estimated else ""}{self.missing_dict[hash][0]}%')
+            pdf_row = [self.feature_hash[hash][0], self.feature_hash[hash][1], self.missing_dict[hash][0], self.missing_dict[hash][1], estimated]
+            pdf_ready_list.append(pdf_row)
+        
+        patterns = self.pattern_rows() if self.co_missing else None
+        
+        if 'pdf' in output_formats:
+            from .pdf_maker import make_report_pdf
+            with instrumentation.stage('pdf_build', rows=len(pdf_ready_list)):
+                make_report_pdf(pdf_ready_list, path=os.path.join(report_dir, 'missing_values_report.pdf'), logo_path=self.logo_path, patterns=patterns)
+        
+        if self.co_missing:
+            self.write_co_missing(report_dir)
+        
+        with instrumentation.stage('stats_write', rows=len(pdf_ready_list)):
+            self.write_stats(report_dir, output_formats)
+        
+        if self.gpkg_path and self.gpkg_id:
+            self.create_gpkg(report_dir)
+        
+        if self.timings_path:
+            instrumentation.dump_json(self.timings_path)
+
+
+    #the original one shot run over csv/*.csv
+    def create_report(self, csv_dir: str = 'csv') -> None:
+        self.profile(glob.glob(os.path.join(csv_dir, "*.csv")))
+        self.write_outputs()
+
+
+#runs inside a pool worker, profiles one csv from an empty report and returns the results for merge_partial
+def profile_worker(settings: dict, csv: str) -> tuple:
+    report = Create_Report(**settings)
+    report.process_file(csv)
+    return report.missing_dict, report.feature_hash, report.missing_ids_by_feature, report.file_counts, report.co_missing, report.intervals, instrumentation.records()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Missing value report for the client csv files")
+    parser.add_argument('--csv-dir', default='csv', help="folder of client csv files")
+    parser.add_argument('--kmz', help="profile the placemarks of this kmz instead of the csv folder")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--config-index', help="compiled index from python -m data_processing_tools.config_index, used instead of --config")
+    parser.add_argument('--report-dir', default='report')
+    parser.add_argument('--logo', default='logos/test.png')
+    parser.add_argument('--high', type=int, default=100)
+    parser.add_argument('--low', type=int, default=0)
+    parser.add_argument('--primary', nargs='*', default=[], help="extra primary fields")
+    parser.add_argument('--secondary', nargs='*', default=[], help="extra secondary fields")
+    parser.add_argument('--gpkg', help="reference GeoPackage of parcels")
+    parser.add_argument('--gpkg-id', help="id column in the reference GeoPackage")
+    parser.add_argument('--max-memory-mb', type=int)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--cache-dir')
+    parser.add_argument('--formats', nargs='+', default=['pdf'], choices=['pdf', 'json', 'parquet'])
+    parser.add_argument('--timings', help="write stage timings to this json file")
+    parser.add_argument('--approximate', action='store_true', help="sample each csv instead of counting every row")
+    parser.add_argument('--sample-rows', type=int, default=20000)
+    parser.add_argument('--co-missing', action='store_true', help="add co-missingness matrices and the most common missing patterns")
+    parser.add_argument('--top-patterns', type=int, default=10)
+    parser.add_argument('--tile-size', type=float, help="add an overview layer of missing counts on a grid of this size")
+    parser.add_argument('--simplify', type=float, help="add a simplified copy of each gpkg layer with this tolerance")
+    args = parser.parse_args()
+
+    config_index = ConfigIndex.load(args.config_index) if args.config_index else None
+    report = Create_Report(high=args.high, low=args.low, additonal_primary=args.primary, additional_secondary=args.secondary,
+                           gpkg_path=args.gpkg, gpkg_id=args.gpkg_id, max_memory_mb=args.max_memory_mb, workers=args.workers,
+                           cache_dir=args.cache_dir, output_formats=args.formats, timings_path=args.timings,
+                           config_path=args.config, report_dir=args.report_dir, logo_path=args.logo,
+                           approximate=args.approximate, sample_rows=args.sample_rows,
+                           co_missing=args.co_missing, top_patterns=args.top_patterns,
+                           tile_size=args.tile_size, simplify_tolerance=args.simplify, config_index=config_index)
+    if args.kmz:
+        report.profile_kmz(args.kmz)
+        report.write_outputs()
+    else:
+        report.create_report(args.csv_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+from functools import partial
+from reportlab.pdfgen import canvas
+from reportlab.platypus import (SimpleDocTemplate, Paragraph, PageBreak, Image, Spacer, Table, TableStyle)
+from reportlab.lib.enums import TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.pagesizes import LETTER, inch
+from reportlab.graphics.shapes import Line, Drawing
+from reportlab.lib.colors import Color
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+#above this many rows make_report_pdf switches to the fast table path
+FAST_ROW_LIMIT = 1000
+
+#a pattern row lists at most this many features, a row taller than a page can't be laid out
+PATTERN_FEATURE_LIMIT = 20
+
+#decoded logos, shared by every page and every report in the process
+_logo_cache = {}
+
+def logo_image(path):
+    if path not in _logo_cache:
+        _logo_cache[path] = ImageReader(path)
+    return _logo_cache[path]
+
+
+class FooterCanvas(canvas.Canvas):
+
+    def __init__(self, *args, logo_path="logos/test.png", **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self.logo_path = logo_path
+        self.pages = []
+        self.width, self.height = LETTER
+
+    def showPage(self):
+        self.pages.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        page_count = len(self.pages)
+        for page in self.pages:
+            self.__dict__.update(page)
+            if (self._pageNumber > 1):
+                self.draw_canvas(page_count)
+            canvas.Canvas.showPage(self)
+        canvas.Canvas.save(self)
+
+    #logos, header and footer rules and the page number font, shared by both canvases
+    def draw_frame(self):
+        self.setStrokeColorRGB(0, 0, 0)
+        self.setLineWidth(0.5)
+        self.drawImage(logo_image(self.logo_path), self.width-inch*8-5, self.height-50, width=100, height=20, preserveAspectRatio=True)
+        self.drawImage(logo_image(self.logo_path), self.width - inch * 2, self.height-50, width=100, height=30, preserveAspectRatio=True, mask='auto')
+        self.line(30, 740, LETTER[0] - 50, 740)
+        self.line(66, 78, LETTER[0] - 66, 78)
+        self.setFont('Times-Roman', 10)
+
+    def draw_canvas(self, page_count):
+        page = "Page %s of %s" % (self._pageNumber, page_count)
+        x = 128
+        self.saveState()
+        self.draw_frame()
+        self.drawString(LETTER[0]-x, 65, page)
+        self.restoreState()
+
+#draws the footer as each page finishes instead of keeping a copy of every page
+#the total page count is a form filled in on save, so a single build pass is enough
+class FastFooterCanvas(FooterCanvas):
+
+    def showPage(self):
+        if (self._pageNumber > 1):
+            self.draw_canvas(None)
+        canvas.Canvas.showPage(self)
+
+    def save(self):
+        self.beginForm("pageCount")
+        self.setFont('Times-Roman', 10)
+        self.drawString(0, 0, str(self._pageNumber - 1))
+        self.endForm()
+        canvas.Canvas.save(self)
+
+    def draw_canvas(self, page_count):
+        page = "Page %s of " % self._pageNumber
+        x = 128
+        self.saveState()
+        self.draw_frame()
+        self.drawString(LETTER[0]-x, 65, page)
+        self.translate(LETTER[0] - x + stringWidth(page, 'Times-Roman', 10), 65)
+        self.doForm("pageCount")
+        self.restoreState()
+
+
+#turns [feature, document, percent, group(, estimated)] rows into table text, skipping rows with nothing missing
+#estimated percentages are shown as ~value%
+def report_rows(input_data):
+    for row in input_data:
+        feature = row[0]
+        doc = row[1]
+        value = row[2]
+        group = row[3]
+        estimated = len(row) > 4 and row[4]
+        
+        if value == 0:
+            continue
+        
+        imp = "Other"
+        if group == 0:
+            imp = "Primary"
+        elif group == 1:
+            imp = "Secondary"
+        
+        yield [feature, doc, f"{'~' if estimated else ''}{value}%", imp]
+
+
+def has_estimates(input_data):
+    return any(len(row) > 4 and row[4] and row[2] != 0 for row in input_data)
+
+
+class PDFReport:
+
+    def __init__(self, path, input_data, fast=False, logo_path="logos/test.png", patterns=None):
+        self.path = path
+        self.styleSheet = getSampleStyleSheet()
+        self.elements = []
+
+        # colors - Azul turkeza 367AB3
+        self.colorOhkaGreen0 = Color((45.0/255), (166.0/255), (153.0/255), 1)
+        self.colorOhkaGreen1 = Color((182.0/255), (227.0/255), (166.0/255), 1)
+        self.colorOhkaGreen2 = Color((140.0/255), (222.0/255), (192.0/255), 1)
+        self.colorOhkaBlue0 = Color((54.0/255), (122.0/255), (179.0/255), 1)
+        self.colorOhkaBlue1 = Color((122.0/255), (180.0/255), (225.0/255), 1)
+        self.colorOhkaGreenLineas = Color((50.0/255), (140.0/255), (140.0/255), 1)
+
+        self.doc = SimpleDocTemplate(path, pagesize=LETTER)
+        self.PagesHeader()
+        # Build
+        if fast:
+            self.FastTableMaker(input_data)
+            if patterns:
+                self.PatternsTable(patterns)
+            self.doc.build(self.elements, canvasmaker=partial(FastFooterCanvas, logo_path=logo_path))
+        else:
+            self.TableMaker(input_data)
+            if patterns:
+                self.PatternsTable(patterns)
+            self.doc.multiBuild(self.elements, canvasmaker=partial(FooterCanvas, logo_path=logo_path))
+        print("Report PDF made")
+
+    def PagesHeader(self):
+        psHeaderText = ParagraphStyle('Hed0', fontSize=16, alignment=TA_LEFT, borderWidth=3, textColor=self.colorOhkaGreen0)
+        text = 'Missing Value Report'
+        paragraphReportHeader = Paragraph(text, psHeaderText)
+        self.elements.append(paragraphReportHeader)
+
+        spacer = Spacer(10, 10)
+        self.elements.append(spacer)
+
+        d = Drawing(500, 1)
+        line = Line(-15, 0, 483, 0)
+        line.strokeColor = self.colorOhkaGreenLineas
+        line.strokeWidth = 2
+        d.add(line)
+        self.elements.append(d)
+
+        spacer = Spacer(10, 1)
+        self.elements.append(spacer)
+
+        d = Drawing(500, 1)
+        line = Line(-15, 0, 483, 0)
+        line.strokeColor = self.colorOhkaGreenLineas
+        line.strokeWidth = 0.5
+        d.add(line)
+        self.elements.append(d)
+
+        spacer = Spacer(10, 22)
+        self.elements.append(spacer)
+
+    def TableMaker(self, input_data):        
+        psHeaderText = ParagraphStyle('Hed0', fontSize=12, alignment=TA_LEFT, borderWidth=3, textColor=self.colorOhkaBlue0)
+        text = 'Missing Values By Percentage'
+        paragraphReportHeader = Paragraph(text, psHeaderText)
+        self.elements.append(paragraphReportHeader)
+
+        spacer = Spacer(10, 22)
+        self.elements.append(spacer)
+        """
+        Create the line items
+        """
+        
+        alignStyle = [ParagraphStyle(name="01", alignment=TA_LEFT),
+                      ParagraphStyle(name="02", alignment=TA_LEFT),
+                      ParagraphStyle(name="03", alignment=TA_LEFT),
+                      ParagraphStyle(name="04", alignment=TA_LEFT)]
+        
+        d = []
+        textData = ["Feature", "Document", "Missing", "Importance"]
+        columnNumber = 0 
+        fontSize = 12
+        for text in textData:
+            ptext = "<font size='%s'><b>%s</b></font>" % (fontSize, text)
+            titlesTable = Paragraph(ptext, alignStyle[columnNumber])
+            d.append(titlesTable)
+            columnNumber += 1   
+
+        data = [d]
+        formattedLineData = []
+
+        for lineData in report_rows(input_data):
+
+            columnNumber = 0
+            for item in lineData:
+                ptext = "<font size='%s'>%s</font>" % (fontSize-1, item)
+                p = Paragraph(ptext, alignStyle[columnNumber])
+                formattedLineData.append(p)
+                columnNumber += 1
+            data.append(formattedLineData)
+            formattedLineData = []
+        
+
+        table = Table(data, colWidths=[150, 200, 80, 80], rowHeights=[30] * len(data))
+        tStyle = TableStyle([ 
+                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+                ("ALIGN", (1, 0), (1, -1), 'RIGHT'),
+                ('LINEABOVE', (0, 0), (-1, -1), 1, self.colorOhkaBlue1),
+                ('BACKGROUND',(0, 0), (-1, 0), self.colorOhkaGreenLineas)
+                ])
+        table.setStyle(tStyle)
+        self.elements.append(table)
+        self.EstimateNote(input_data)
+
+    #explains the ~ on percentages that came from a sample
+    def EstimateNote(self, input_data):
+        if not has_estimates(input_data):
+            return
+        self.elements.append(Spacer(10, 12))
+        text = "~ Estimated from a sample of rows, the confidence intervals are in the json/parquet statistics."
+        self.elements.append(Paragraph("<font size='9'>%s</font>" % text, ParagraphStyle(name="note", alignment=TA_LEFT)))
+
+    #plain string cells with one shared style, split into page sized tables
+    def FastTableMaker(self, input_data):
+        psHeaderText = ParagraphStyle('Hed0', fontSize=12, alignment=TA_LEFT, borderWidth=3, textColor=self.colorOhkaBlue0)
+        text = 'Missing Values By Percentage'
+        paragraphReportHeader = Paragraph(text, psHeaderText)
+        self.elements.append(paragraphReportHeader)
+
+        spacer = Spacer(10, 22)
+        self.elements.append(spacer)
+
+        header = ["Feature", "Document", "Missing", "Importance"]
+        rowHeight = 30
+        rowsPerPage = max(int(self.doc.height // rowHeight) - 1, 1)
+
+        tStyle = TableStyle([
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('FONTSIZE', (0, 1), (-1, -1), 11),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+                ("ALIGN", (1, 0), (1, -1), 'RIGHT'),
+                ('LINEABOVE', (0, 0), (-1, -1), 1, self.colorOhkaBlue1),
+                ('BACKGROUND',(0, 0), (-1, 0), self.colorOhkaGreenLineas)
+                ])
+
+        rows = list(report_rows(input_data))
+        for start in range(0, max(len(rows), 1), rowsPerPage):
+            data = [header] + rows[start:start + rowsPerPage]
+            table = Table(data, colWidths=[150, 200, 80, 80], rowHeights=rowHeight, repeatRows=1)
+            table.setStyle(tStyle)
+            self.elements.append(table)
+        self.EstimateNote(input_data)
+
+    #[document, rows, percent, features missing] rows, the feature lists wrap so they stay Paragraphs
+    #long lists are cut to PATTERN_FEATURE_LIMIT names so each row fits on a page, co_missing.json has them all
+    def PatternsTable(self, patterns):
+        self.elements.append(PageBreak())
+        psHeaderText = ParagraphStyle('Hed0', fontSize=12, alignment=TA_LEFT, borderWidth=3, textColor=self.colorOhkaBlue0)
+        text = 'Most Common Missing Patterns'
+        paragraphReportHeader = Paragraph(text, psHeaderText)
+        self.elements.append(paragraphReportHeader)
+
+        spacer = Spacer(10, 22)
+        self.elements.append(spacer)
+
+        cellStyle = ParagraphStyle(name="patterns", alignment=TA_LEFT, fontSize=10, leading=12)
+        data = [["Document", "Rows", "Missing", "Features Missing"]]
+        for doc, count, value, features in patterns:
+            text = ", ".join(features[:PATTERN_FEATURE_LIMIT])
+            if len(features) > PATTERN_FEATURE_LIMIT:
+                text += f" and {len(features) - PATTERN_FEATURE_LIMIT} more"
+            data.append([doc, f"{count:,}", f"{value}%", Paragraph(text, cellStyle)])
+
+        table = Table(data, colWidths=[130, 70, 60, 250], repeatRows=1)
+        tStyle = TableStyle([
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('FONTSIZE', (0, 1), (-1, -1), 10),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('LINEABOVE', (0, 0), (-1, -1), 1, self.colorOhkaBlue1),
+                ('BACKGROUND',(0, 0), (-1, 0), self.colorOhkaGreenLineas)
+                ])
+        table.setStyle(tStyle)
+        self.elements.append(table)
+
+def make_report_pdf(data, fast=None, path='report/missing_values_report.pdf', logo_path='logos/test.png', patterns=None):
+    #large tables default to the fast path
+    if fast is None:
+        fast = len(data) > FAST_ROW_LIMIT
+    return PDFReport(path, data, fast, logo_path, patterns)
\ No newline at end of file
@@ -0,0 +1,138 @@
+import json
+import logging
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+
+#timing and memory records for each stage the tools run, shared by all three tools
+#callbacks get every record as it finishes, records are also logged at debug level
+logger = logging.getLogger('data_processing_tools')
+
+_records = []
+_callbacks = []
+
+
+def add_callback(callback) -> None:
+    _callbacks.append(callback)
+
+
+def remove_callback(callback) -> None:
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+
+def records() -> list:
+    return list(_records)
+
+
+def reset() -> None:
+    _records.clear()
+
+
+#resident set size right now, from /proc on linux and psutil elsewhere when it's installed
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/statm', "rb") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+#polls rss on a background thread while a stage runs, so each stage gets its own peak
+#instead of the process high-water mark left behind by whatever ran before it
+#peaks inside a single call that holds the gil are only seen if they last until the call returns
+class RssSampler():
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self._done = threading.Event()
+        self._thread = None
+
+
+    def sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+
+    def _poll(self) -> None:
+        while not self._done.wait(self.interval):
+            self.sample()
+
+
+    def __enter__(self):
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+
+
+    @property
+    def delta_mb(self) -> float:
+        if self.start_mb is None:
+            return None
+        return round(self.peak_mb - self.start_mb, 1)
+
+
+    @property
+    def peak(self) -> float:
+        return None if self.peak_mb is None else round(self.peak_mb, 1)
+
+
+#peak_rss_mb is the highest rss seen during the stage, rss_delta_mb how far that is above the rss it started at
+def record(name: str, seconds: float, rows: int = None, peak_rss_mb: float = None, rss_delta_mb: float = None, **info) -> dict:
+    entry = {'stage': name, 'seconds': round(seconds, 4), 'rows': rows, 'peak_rss_mb': peak_rss_mb, 'rss_delta_mb': rss_delta_mb}
+    entry.update(info)
+
+    _records.append(entry)
+    logger.debug("%s took %.3fs (rows=%s, peak=%sMB, delta=%sMB)", name, seconds, rows, peak_rss_mb, rss_delta_mb)
+    for callback in _callbacks:
+        callback(entry)
+    return entry
+
+
+#adds records made somewhere else, e.g. in a pool worker
+def extend(entries: list) -> None:
+    for entry in entries:
+        _records.append(entry)
+        for callback in _callbacks:
+            callback(entry)
+
+
+#with stage('csv_load', file='x') as s: ... s['rows'] = len(df)
+@contextmanager
+def stage(name: str, rows: int = None, **info):
+    entry = {'rows': rows}
+    start = time.perf_counter()
+    memory = RssSampler()
+    try:
+        with memory:
+            yield entry
+    finally:
+        rows = entry.pop('rows')
+        info.update(entry)
+        record(name, time.perf_counter() - start, rows, peak_rss_mb=memory.peak, rss_delta_mb=memory.delta_mb, **info)
+
+
+def dump_json(file_path: str) -> None:
+    with open(file_path, "w") as json_file:
+        json.dump(_records, json_file, indent=2)
@@ -0,0 +1,3 @@
+from .kmz_to_csv import main
+
+main()
@@ -0,0 +1,269 @@
+from zipfile import ZipFile
+from lxml import etree, html
+import shutil
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .outputs import make_output
+from .. import instrumentation
+
+# Step 1: Extract KMZ file
+def extract_kmz(kmz_path, output_folder='extracted_kml'):
+    with ZipFile(kmz_path, 'r') as kmz:
+        kmz.extractall(output_folder)
+    for file in kmz.namelist():
+        if file.endswith('.kml'):
+            return f"{output_folder}/{file}"
+    raise FileNotFoundError("No KML file found in the KMZ.")
+
+
+# Step 2: get HTML descriptions from KML
+def parse_kml(kml_file_path):
+    from pykml import parser
+
+    with open(kml_file_path, 'r') as kml_file:
+        k = parser.parse(kml_file).getroot()
+
+    # Look for documents, folders and placeholders
+    if hasattr(k, 'Document'):
+        document = k.Document
+        print("Debug: Found Document tag.")
+        
+        folders = document.Folder
+        print(f"Debug: Found {len(folders)} folder(s)")
+
+        placemarks = []
+        for folder in folders:
+            for placemark in folder.Placemark:
+                placemarks.append(placemark)
+
+        # process placemarks
+        if placemarks:
+            print(f"Debug: Found {len(placemarks)} placemark(s).")
+            return placemarks
+        else:
+            print("Debug: No placemarks found in folder.")
+    else:
+        print("Debug: No Document tag found.")
+        
+    return placemarks
+
+# Step 2 (streaming): read the KML straight out of the KMZ and yield each placemark's description and geometry
+# building geometry costs more than the parse itself, so it's None unless with_geometry is set
+def iter_placemarks(kmz_path, with_geometry=False):
+    with ZipFile(kmz_path, 'r') as kmz:
+        kml_names = [name for name in kmz.namelist() if name.endswith('.kml')]
+        if not kml_names:
+            raise FileNotFoundError("No KML file found in the KMZ.")
+
+        with kmz.open(kml_names[0]) as kml_file:
+            count = 0
+            for _, placemark in etree.iterparse(kml_file, events=('end',), tag='{*}Placemark'):
+                description = placemark.find('{*}description')
+                if description is not None and description.text:
+                    yield description.text, placemark_geometry(placemark) if with_geometry else None
+                    count += 1
+
+                # free the placemark and everything parsed before it
+                placemark.clear()
+                while placemark.getprevious() is not None:
+                    del placemark.getparent()[0]
+
+    print(f"Debug: Found {count} placemark(s).")
+
+
+def iter_descriptions(kmz_path):
+    for description, _ in iter_placemarks(kmz_path):
+        yield description
+
+
+# "lon,lat[,alt] lon,lat[,alt] ..." to a list of (lon, lat)
+def parse_coordinates(text):
+    return [tuple(float(v) for v in coord.split(',')[:2]) for coord in text.split()]
+
+
+# Point, Polygon or MultiPolygon for a placemark, None when it has no geometry
+def placemark_geometry(placemark):
+    from shapely.geometry import Point, Polygon, MultiPolygon
+
+    polygons = []
+    for polygon in placemark.iter('{*}Polygon'):
+        outer = polygon.find('{*}outerBoundaryIs/{*}LinearRing/{*}coordinates')
+        if outer is None or not outer.text:
+            continue
+        inners = polygon.findall('{*}innerBoundaryIs/{*}LinearRing/{*}coordinates')
+        polygons.append(Polygon(parse_coordinates(outer.text), [parse_coordinates(i.text) for i in inners if i.text]))
+
+    if len(polygons) == 1:
+        return polygons[0]
+    if polygons:
+        return MultiPolygon(polygons)
+
+    coordinates = placemark.find('.//{*}Point/{*}coordinates')
+    if coordinates is not None and coordinates.text:
+        return Point(parse_coordinates(coordinates.text)[0])
+    return None
+
+
+# Step 3.2: create a dictionary form the html 
+# lxml does the same walk as BeautifulSoup at a fraction of the cost
+# html.parser (the fallback, and the original parser) doesn't close <td> and <tr> implicitly the way lxml does,
+# e.g. <tr><td>k1<td>v1</tr> is {'k1v1': 'v1'} there, so descriptions that leave them open go to the fallback
+def parse_html_table(description):
+    lowered = description.lower()
+    if lowered.count('<td') != lowered.count('</td') or lowered.count('<tr') != lowered.count('</tr'):
+        return parse_html_table_soup(description)
+
+    try:
+        root = html.fragment_fromstring(description, create_parent='div')
+    except (etree.ParserError, ValueError):
+        return parse_html_table_soup(description)
+
+    table = next(root.iter('table'), None)
+    if table is None:
+        return parse_html_table_soup(description)
+
+    data = {}
+
+    # Iterate over all rows in the table (excluding the header row)
+    rows = list(table.iter('tr'))[1:]
+    for row in rows:
+        cols = list(row.iter('td'))
+        if len(cols) == 2:  # Ensure the row has key-value pair
+            key = cols[0].text_content().strip()
+            value = cols[1].text_content().strip()
+            data[key] = value
+    return data
+
+
+# fallback for descriptions lxml can't make a table out of
+def parse_html_table_soup(description):
+    from bs4 import BeautifulSoup
+
+    # Parse the description using BeautifulSoup
+    soup = BeautifulSoup(description, 'html.parser')
+
+    table = soup.find('table')
+    data = {}
+    
+    # Iterate over all rows in the table (excluding the header row)
+    rows = table.find_all('tr')[1:]
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) == 2:  # Ensure the row has key-value pair
+            key = cols[0].text.strip()
+            value = cols[1].text.strip()
+            data[key] = value
+    return data
+
+
+# parses one batch of descriptions, runs in a worker process when workers > 1
+def parse_batch(descriptions):
+    return [parse_html_table(description) for description in descriptions]
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# yields (rows, geometries) batches in placemark order, keeping at most a few batches in flight
+def iter_parsed_batches(placemarks, workers=1, batch_size=10000):
+    if workers <= 1:
+        for batch in batched(placemarks, batch_size):
+            yield parse_batch([d for d, _ in batch]), [g for _, g in batch]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batched(placemarks, batch_size):
+            # geometries stay in this process, only the descriptions are shipped to workers
+            pending.append((pool.submit(parse_batch, [d for d, _ in batch]), [g for _, g in batch]))
+            if len(pending) >= workers * 2:
+                future, geometries = pending.popleft()
+                yield future.result(), geometries
+        while pending:
+            future, geometries = pending.popleft()
+            yield future.result(), geometries
+
+
+# Step 3.1: go through each description, convert to dict and write to the output a batch at a time
+def write_placemarks(placemarks, output_format='csv', output_path=None, schema=None, workers=1, batch_size=10000):
+    output = make_output(output_format, output_path, schema)
+
+    # reading and parsing are interleaved with writing, so time the writes and attribute the rest to parsing
+    # for the same reason both records get the memory of the whole conversion
+    start = time.perf_counter()
+    write_seconds = 0
+    row_count = 0
+    with instrumentation.RssSampler() as memory:
+        for rows, geometries in iter_parsed_batches(placemarks, workers, batch_size):
+            write_start = time.perf_counter()
+            output.write(rows, geometries)
+            write_seconds += time.perf_counter() - write_start
+            row_count += len(rows)
+
+        write_start = time.perf_counter()
+        output.close()
+        write_seconds += time.perf_counter() - write_start
+
+    instrumentation.record('kmz_parse', time.perf_counter() - start - write_seconds, row_count, peak_rss_mb=memory.peak, rss_delta_mb=memory.delta_mb)
+    instrumentation.record('kmz_write', write_seconds, row_count, peak_rss_mb=memory.peak, rss_delta_mb=memory.delta_mb, format=output_format)
+    print(f"Descriptions moved to {output_format}")
+
+
+def descriptions_to_csv(descriptions, workers=1, batch_size=10000):
+    write_placemarks(((d, None) for d in descriptions), workers=workers, batch_size=batch_size)
+
+
+def kmz_to_csv(kmz_path, stream=False, workers=1, output_format='csv', output_path=None, schema=None, timings_path=None, extract_folder='extracted_kml'):
+    # streaming reads placemarks from the zip without extracting or building the whole tree
+    # only the gpkg output keeps the geometry
+    with_geometry = output_format == 'gpkg'
+    # timings_path only gets the stages of this conversion
+    instrumentation.reset()
+    if stream:
+        write_placemarks(iter_placemarks(kmz_path, with_geometry), output_format, output_path, schema, workers)
+        if timings_path:
+            instrumentation.dump_json(timings_path)
+        return
+
+    with instrumentation.stage('kmz_extract'):
+        kml_path = extract_kmz(kmz_path, extract_folder)
+    with instrumentation.stage('kml_load') as s:
+        placemarks = parse_kml(kml_path)
+        s['rows'] = len(placemarks)
+    pairs = ((placemark.description.text, placemark_geometry(placemark) if with_geometry else None) for placemark in placemarks)
+    write_placemarks(pairs, output_format, output_path, schema, workers)
+    temp_dir_name = os.path.dirname(kml_path)
+    shutil.rmtree(temp_dir_name)
+    if timings_path:
+        instrumentation.dump_json(timings_path)
+
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Convert the placemark description tables in a KMZ to a table")
+    arg_parser.add_argument('kmz_path')
+    arg_parser.add_argument('--stream', action='store_true', help="read the KML from the zip without extracting it")
+    arg_parser.add_argument('--workers', type=int, default=1)
+    arg_parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'feather', 'gpkg'])
+    arg_parser.add_argument('--output', help="output file, defaults to Parcels.<format>")
+    arg_parser.add_argument('--extract-folder', default='extracted_kml')
+    arg_parser.add_argument('--timings', help="write stage timings to this json file")
+    args = arg_parser.parse_args()
+
+    kmz_to_csv(args.kmz_path, args.stream, args.workers, args.format, args.output, timings_path=args.timings, extract_folder=args.extract_folder)
+
+
+if __name__ == '__main__':
+    main()
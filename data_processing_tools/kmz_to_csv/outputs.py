@@ -0,0 +1,226 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+DEFAULT_NAMES = {
+    'csv': 'Parcels.csv',
+    'parquet': 'Parcels.parquet',
+    'feather': 'Parcels.feather',
+    'gpkg': 'Parcels.gpkg',
+}
+
+
+# every column is a string straight out of the description table
+def infer_schema(rows, dictionary=False):
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    value_type = pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+    return pa.schema([(column, value_type) for column in columns])
+
+
+# the schema with any columns these rows add on the end, the same schema object when there are none
+def widen_schema(schema, rows, dictionary=False):
+    inferred = infer_schema(rows, dictionary)
+    if schema is None:
+        return inferred
+    added = [field for field in inferred if field.name not in schema.names]
+    return pa.schema(list(schema) + added) if added else schema
+
+
+# fills the columns a table doesn't have with nulls
+def conform(table, schema):
+    arrays = [table.column(field.name) if field.name in table.column_names else pa.nulls(table.num_rows, field.type) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def is_text(value_type):
+    if pa.types.is_dictionary(value_type):
+        value_type = value_type.value_type
+    return pa.types.is_string(value_type) or pa.types.is_large_string(value_type)
+
+
+# build an arrow table for one batch, casting the string values to the schema types
+# text columns (dictionary encoded or not) keep empty cells as '', like the csv and gpkg outputs
+def rows_to_table(rows, schema):
+    arrays = []
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if not is_text(field.type):
+            # empty cells can't be cast to numbers or dates
+            values = [value if value != '' else None for value in values]
+        arrays.append(pa.array(values, pa.string()).cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# only used with a schema passed in by the caller, inferred schemas grow instead
+def report_dropped(rows, schema, dropped):
+    for row in rows:
+        for key in row:
+            if key not in schema.names and key not in dropped:
+                dropped.add(key)
+                print(f"Warning: column {key} is not in the output schema and was dropped")
+
+
+# csv rows go to a body file first since later batches can add columns to the header
+class CsvOutput:
+
+    def __init__(self, path):
+        self.path = path
+        self.body_path = f"{path}.body"
+        self.body = open(self.body_path, 'w', newline='')
+        self.columns = []
+
+    def write(self, rows, geometries):
+        for row in rows:
+            for key in row:
+                if key not in self.columns:
+                    self.columns.append(key)
+        pd.DataFrame(rows).reindex(columns=self.columns).to_csv(self.body, index=False, header=False)
+
+    def close(self):
+        self.body.close()
+        with open(self.path, 'w', newline='') as out, open(self.body_path, 'r', newline='') as body:
+            pd.DataFrame(columns=self.columns).to_csv(out, index=False)
+            shutil.copyfileobj(body, out)
+        os.remove(self.body_path)
+
+
+# the parquet and feather writers fix their schema when they open, so with an inferred schema a batch
+# that brings new columns closes the file so far as a part and opens the next one with the wider schema
+# close() rewrites the parts into one file, with nulls for the columns a part didn't have
+class ArrowOutput:
+
+    dictionary = False
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.schema = schema
+        self.infer = schema is None
+        self.writer = None
+        self.parts = []
+        self.dropped = set()
+
+    def open_writer(self, path, schema):
+        raise NotImplementedError
+
+    def read_part(self, path):
+        raise NotImplementedError
+
+    def write(self, rows, geometries):
+        if self.infer:
+            schema = widen_schema(self.schema, rows, self.dictionary)
+            if schema is not self.schema and self.writer is not None:
+                self.writer.close()
+                self.writer = None
+            self.schema = schema
+        else:
+            report_dropped(rows, self.schema, self.dropped)
+
+        if self.writer is None:
+            self.parts.append(f"{self.path}.part{len(self.parts)}")
+            self.writer = self.open_writer(self.parts[-1], self.schema)
+        self.writer.write_table(rows_to_table(rows, self.schema))
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        if len(self.parts) == 1:
+            os.replace(self.parts[0], self.path)
+            return
+
+        writer = self.open_writer(self.path, self.schema)
+        for part in self.parts:
+            for table in self.read_part(part):
+                writer.write_table(conform(table, self.schema))
+            os.remove(part)
+        writer.close()
+
+
+# one row group per batch, repeated strings are dictionary encoded
+class ParquetOutput(ArrowOutput):
+
+    dictionary = True
+
+    def open_writer(self, path, schema):
+        return pq.ParquetWriter(path, schema, use_dictionary=True)
+
+    def read_part(self, path):
+        part = pq.ParquetFile(path)
+        for i in range(part.num_row_groups):
+            yield part.read_row_group(i)
+
+
+# feather v2 is the arrow ipc file format, written a record batch at a time
+class FeatherOutput(ArrowOutput):
+
+    def open_writer(self, path, schema):
+        return pa.ipc.new_file(path, schema)
+
+    def read_part(self, path):
+        with pa.ipc.open_file(path) as part:
+            for i in range(part.num_record_batches):
+                yield pa.Table.from_batches([part.get_batch(i)])
+
+
+# keeps the placemark point/polygon, each batch is appended to the layer
+# a batch with new columns rewrites the layer written so far with the wider set of columns
+class GpkgOutput:
+
+    def __init__(self, path, layer='parcels'):
+        self.path = path
+        self.layer = layer
+        self.columns = None
+
+    def write(self, rows, geometries):
+        import geopandas as gpd
+
+        columns = list(self.columns or [])
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+
+        if self.columns is None:
+            mode = 'w'
+        elif columns != self.columns:
+            written = gpd.read_file(self.path, layer=self.layer, engine='pyogrio')
+            self.write_layer(written.drop(columns=written.geometry.name), written.geometry, columns, 'w')
+            mode = 'a'
+        else:
+            mode = 'a'
+        self.columns = columns
+
+        self.write_layer(pd.DataFrame(rows), gpd.GeoSeries(geometries, crs='EPSG:4326'), columns, mode)
+
+    def write_layer(self, df, geometry, columns, mode):
+        import geopandas as gpd
+
+        # every column is text, including the ones a batch has no values for
+        gdf = gpd.GeoDataFrame(pd.DataFrame(df).reindex(columns=columns).astype(object), geometry=geometry)
+        # placemarks can mix points and polygons in one layer
+        gdf.to_file(self.path, layer=self.layer, driver='GPKG', mode=mode, engine='pyogrio', geometry_type='Unknown')
+
+    def close(self):
+        pass
+
+
+def make_output(output_format='csv', output_path=None, schema=None):
+    if output_format not in DEFAULT_NAMES:
+        raise ValueError(f"Unknown output format {output_format}, expected one of {list(DEFAULT_NAMES)}")
+
+    path = output_path or DEFAULT_NAMES[output_format]
+    if output_format == 'parquet':
+        return ParquetOutput(path, schema)
+    if output_format == 'feather':
+        return FeatherOutput(path, schema)
+    if output_format == 'gpkg':
+        return GpkgOutput(path)
+    return CsvOutput(path)
@@ -0,0 +1,58 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+#helpers for the approximate profiling modes, shared by both report tools
+
+
+def z_score(confidence: float) -> float:
+    return NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+
+#wilson score interval for k missing out of n sampled rows, as proportions
+def wilson_interval(k: int, n: int, z: float) -> tuple:
+    if n == 0:
+        return 0.0, 1.0
+    p = k / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+#wilson interval for a sample drawn in clusters, e.g. blocks of csv lines or whole row groups
+#k and n are the missing and sampled rows of each cluster
+#nulls tend to come in runs, so rows of one cluster aren't independent and the interval is taken over
+#the effective sample size, the row count divided by the design effect estimated from the variance between clusters
+def cluster_interval(k, n, z: float) -> tuple:
+    k = np.asarray(k, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    clusters = len(n)
+    rows = float(n.sum())
+    if rows == 0:
+        return 0.0, 1.0
+    p = float(k.sum()) / rows
+    
+    if clusters < 2 or p == 0 or p == 1:
+        #nothing to estimate the spread from, so each cluster only counts as one row
+        effective = clusters
+    else:
+        #variance of the ratio estimate between clusters against the variance of a simple random sample
+        cluster_variance = float(((k - p * n) ** 2).sum()) / (clusters - 1) / clusters / (rows / clusters) ** 2
+        design_effect = max(cluster_variance / (p * (1 - p) / rows), 1.0)
+        effective = rows / design_effect
+    return wilson_interval(p * effective, effective, z)
+
+
+#True when the interval (in percent) could land on either side of low or high
+#the reports compare rounded percentages, so the bounds are rounded the same way
+def straddles(lower: float, upper: float, low: float, high: float) -> bool:
+    lower = round(lower, 2)
+    upper = round(upper, 2)
+    inside_low = lower > low
+    outside_low = upper <= low
+    inside_high = upper < high
+    outside_high = lower >= high
+    return not ((inside_low or outside_low) and (inside_high or outside_high))
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+
+#overview layers for the missing value GeoPackages, shared by both report tools
+#reviewers can open these instead of loading every parcel
+TILE_LAYER = 'overview_tiles'
+
+
+#square grid cells of tile_size (in the units of the crs) with the number of rows
+#and, for each mask, the number of rows missing that feature
+#rows are placed by the middle of their bounding box, so polygons land in exactly one cell
+def tile_layer(geometry, masks: dict, tile_size: float):
+    import geopandas as gpd
+    import shapely
+
+    #null geometries and the POINT (nan nan) points_from_xy makes for missing coordinates have no place on the grid
+    bounds = geometry.bounds
+    mid_x = (bounds['minx'] + bounds['maxx']).to_numpy() / 2
+    mid_y = (bounds['miny'] + bounds['maxy']).to_numpy() / 2
+    placed = ~(geometry.isna() | geometry.is_empty).to_numpy() & np.isfinite(mid_x) & np.isfinite(mid_y)
+
+    counts = pd.DataFrame({
+        'tile_x': np.floor(mid_x[placed] / tile_size).astype(np.int64),
+        'tile_y': np.floor(mid_y[placed] / tile_size).astype(np.int64),
+        'rows': 1,
+    })
+    for name, mask in masks.items():
+        counts[name] = np.asarray(mask, dtype=np.int64)[placed]
+    counts = counts.groupby(['tile_x', 'tile_y'], sort=True).sum().reset_index()
+
+    cells = shapely.box(counts['tile_x'] * tile_size, counts['tile_y'] * tile_size,
+                        (counts['tile_x'] + 1) * tile_size, (counts['tile_y'] + 1) * tile_size)
+    return gpd.GeoDataFrame(counts, geometry=cells, crs=geometry.crs)
+
+
+def simplified(gdf, tolerance: float):
+    gdf = gdf.copy()
+    gdf.geometry = gdf.geometry.simplify(tolerance, preserve_topology=True)
+    return gdf
@@ -0,0 +1,107 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+from data_processing_tools.dataset_missing_report.create_dataset_report import count_missing_by_dataset, estimate_missing_by_dataset
+
+
+def write_intermediate(path, categorical):
+    df = pd.DataFrame({
+        'dataset': ['a', 'b', None, 'a', 'b', None] * 50,
+        'zoning': ['R1', None, 'C2', None, None, 'R1'] * 50,
+        'sale_price': [1.0, 2.0, None, 4.0, None, None] * 50,
+    })
+    if categorical:
+        df['dataset'] = df['dataset'].astype('category')
+    #one mixed row group, so the counts can't come from the statistics alone
+    df.to_parquet(path, index=False, row_group_size=len(df))
+    return df
+
+
+def expected_counts(df):
+    counts = {}
+    for dataset, group in df.groupby(df['dataset'].astype(object).where(df['dataset'].notna(), 'none')):
+        counts[None if dataset == 'none' else dataset] = (len(group), int(group['zoning'].isna().sum()), int(group['sale_price'].isna().sum()))
+    return counts
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_count_missing_by_dataset(tmp_path, categorical):
+    path = str(tmp_path / 'intermediate.parquet')
+    df = write_intermediate(path, categorical)
+
+    for totals, missing_counts in (count_missing_by_dataset(path), estimate_missing_by_dataset(path, 100, 0)[:2]):
+        for dataset, (total, zoning, sale_price) in expected_counts(df).items():
+            assert totals[dataset] == total
+            assert missing_counts[dataset]['zoning'] == zoning
+            assert missing_counts[dataset]['sale_price'] == sale_price
+
+
+def test_evaluate_thresholds_rounds_like_the_reports():
+    from data_processing_tools.dataset_missing_report.create_dataset_report import evaluate_thresholds
+
+    totals = {'a': 4000, None: 0}
+    missing_counts = {'a': {'dataset': 0, 'zoning': 13}, None: {'dataset': 0, 'zoning': 0}}
+    frame = evaluate_thresholds(totals, missing_counts, ['a', None], 100, 0)
+
+    zoning = frame[(frame['dataset'] == 'a') & (frame['feature'] == 'zoning')].iloc[0]
+    assert zoning['percent_missing'] == round((13 / 4000) * 100, 2) == 0.33
+    assert frame.loc[frame['dataset'] == 'none', 'percent_missing'].tolist() == [0, 0]
+
+
+def test_estimated_counts_carry_intervals(tmp_path):
+    path = str(tmp_path / 'intermediate.parquet')
+    df = pd.DataFrame({
+        'dataset': ['a', 'b', 'c', None] * 5000,
+        'zoning': ['R1', None, 'C2', None, None] * 4000,
+    })
+    df.to_parquet(path, index=False, row_group_size=1000)
+
+    totals, missing_counts, intervals = estimate_missing_by_dataset(path, 100, 0, sample_rows=2000)
+
+    assert intervals
+    for dataset, features in intervals.items():
+        for feature, (ci_low, ci_high) in features.items():
+            percent = round(missing_counts[dataset][feature] / totals[dataset] * 100, 2)
+            assert ci_low <= percent <= ci_high
+
+
+def test_create_gpkg_writes_missing_rows_per_feature(tmp_path):
+    pyogrio = pytest.importorskip('pyogrio')
+    from data_processing_tools.dataset_missing_report.create_dataset_report import create_gpkg
+
+    df = pd.DataFrame({
+        'latitude': [40.0, 40.1, 40.2, 40.3],
+        'longitude': [-105.0, -105.1, -105.2, -105.3],
+        'zoning': ['R1', None, None, 'C2'],
+        'sale_price': [None, 1.0, 2.0, 3.0],
+    })
+    synchronous = pyogrio.get_gdal_config_option('OGR_SQLITE_SYNCHRONOUS')
+
+    #the second run replaces the layers instead of adding to them
+    for _ in range(2):
+        create_gpkg(df, 'a', ['zoning', 'sale_price'], str(tmp_path), tile_size=0.1)
+
+    path = str(tmp_path / 'shapefiles' / 'a.gpkg')
+    assert [list(layer) for layer in pyogrio.list_layers(path)] == [['zoning', 'Point'], ['sale_price', 'Point'], ['overview_tiles', 'Polygon']]
+    assert pyogrio.read_dataframe(path, layer='zoning').geometry.y.round(1).tolist() == [40.1, 40.2]
+    assert len(pyogrio.read_dataframe(path, layer='sale_price')) == 1
+    assert pyogrio.get_gdal_config_option('OGR_SQLITE_SYNCHRONOUS') == synchronous
+
+
+#whole row groups are missing zoning, half of them, so only an exact count lands on high=50
+def test_clustered_nulls_are_counted_exactly_at_the_threshold(tmp_path):
+    np = pytest.importorskip('numpy')
+    path = str(tmp_path / 'intermediate.parquet')
+    rows = 200000
+    groups = np.arange(rows) // 2000
+    pd.DataFrame({
+        'dataset': np.where(np.arange(rows) % 2 == 0, 'a', 'b'),
+        'zoning': np.where(groups % 4 < 2, None, 'R1'),
+    }).to_parquet(path, index=False, row_group_size=2000)
+
+    totals, missing_counts, intervals = estimate_missing_by_dataset(path, 50, 0, sample_rows=20000)
+
+    for dataset in ('a', 'b'):
+        assert missing_counts[dataset]['zoning'] == totals[dataset] // 2
+        assert 'zoning' not in intervals.get(dataset, {})
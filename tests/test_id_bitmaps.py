@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('pandas')
+from data_processing_tools.init_data_report.id_bitmaps import IdBitmaps
+
+
+def test_ids_follow_the_dictionary_as_it_grows():
+    bitmaps = IdBitmaps()
+    bitmaps.add('zoning', ['a', 'b', None, 'c'])
+    assert bitmaps.ids('zoning') == ['a', 'b', 'c']
+
+    #the cached id array is reused and extended, not rebuilt
+    id_values = bitmaps.id_array()
+    assert bitmaps.id_array() is id_values
+    bitmaps.add('sale_price', ['c', 'd', 'e'])
+    assert bitmaps.ids('sale_price') == ['c', 'd', 'e']
+    assert bitmaps.ids('zoning') == ['a', 'b', 'c']
+
+
+def test_merge_keeps_ids():
+    first = IdBitmaps()
+    first.add('zoning', ['a', 'b'])
+    second = IdBitmaps()
+    second.add('zoning', ['c', 'a'])
+    second.add('zip', ['d'])
+
+    first.merge(second)
+    assert sorted(first.ids('zoning')) == ['a', 'b', 'c']
+    assert first.ids('zip') == ['d']
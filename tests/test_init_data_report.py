@@ -0,0 +1,137 @@
+import glob
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+from data_processing_tools import instrumentation
+from data_processing_tools.init_data_report.init_data_report import Create_Report
+from benchmarks.generators import write_parcel_csvs, write_kmz, write_config as write_parcel_config
+
+
+def write_config(path, columns):
+    config = {'data': {'parcels': {'transform': {'rename': {c: c for c in columns}}}}}
+    with open(path, "w") as json_file:
+        json.dump(config, json_file)
+    return str(path)
+
+
+#nulls in runs of 2000 rows, exactly half of the rows, so only an exact count lands on high=50
+def test_clustered_nulls_are_counted_exactly_at_the_threshold(tmp_path):
+    rows = 400000
+    runs = np.arange(rows) // 2000
+    pd.DataFrame({
+        'key_primary': np.arange(rows).astype(str),
+        'zoning': np.where(runs % 2 == 0, None, 'R1'),
+    }).to_csv(tmp_path / 'parcels.csv', index=False)
+
+    config_path = write_config(tmp_path / 'config.json', ['key_primary', 'zoning'])
+    report = Create_Report(high=50, config_path=config_path, approximate=True)
+    report.profile([str(tmp_path / 'parcels.csv')])
+
+    assert report.file_counts['parcels'][1]['zoning'] == rows // 2
+    assert 'zoningparcels' not in report.intervals
+
+
+def profiled(report):
+    ids = {hash: sorted(report.missing_ids_by_feature.ids(hash)) for hash in report.missing_ids_by_feature}
+    return report.missing_dict, report.file_counts, ids
+
+
+def stage_count(name):
+    return sum(1 for r in instrumentation.records() if r['stage'] == name)
+
+
+def test_cached_uncached_and_pooled_runs_agree(tmp_path):
+    n_cols = 8
+    paths = write_parcel_csvs(str(tmp_path / 'csv'), 3, 2000, n_cols)
+    config_path = str(tmp_path / 'config.json')
+    write_parcel_config(config_path, n_cols, ['table_0', 'table_1', 'table_2'])
+    cache_dir = str(tmp_path / 'cache')
+    settings = {'config_path': config_path, 'gpkg_path': 'reference.gpkg', 'gpkg_id': 'PARCEL_ID'}
+
+    def run(**options):
+        report = Create_Report(**settings, **options)
+        report.profile(paths)
+        return report
+
+    expected = profiled(run())
+
+    #first cached run misses and fills the cache, the second is served from it
+    assert profiled(run(cache_dir=cache_dir)) == expected
+    assert stage_count('cache_hit') == 0
+    stat_files = sorted(glob.glob(os.path.join(cache_dir, 'stat-*.json')))
+    assert len(stat_files) == 3
+    stat_mtimes = [os.stat(p).st_mtime_ns for p in stat_files]
+
+    assert profiled(run(cache_dir=cache_dir)) == expected
+    assert stage_count('cache_hit') == 3
+    #unchanged size and mtime reuse the stored content hash instead of rewriting it
+    assert [os.stat(p).st_mtime_ns for p in stat_files] == stat_mtimes
+
+    #a touched file with the same content gets a new stat entry but the same profile
+    os.utime(paths[0], ns=(stat_mtimes[0], stat_mtimes[0] + 10**9))
+    assert profiled(run(cache_dir=cache_dir)) == expected
+    assert stage_count('cache_hit') == 3
+
+    #pool workers read and write the same cache
+    assert profiled(run(cache_dir=cache_dir, workers=2)) == expected
+    assert stage_count('cache_hit') == 3
+    assert profiled(run(workers=2)) == expected
+
+    #other thresholds or another rename mapping can't reuse the profiles
+    run(cache_dir=cache_dir, low=10)
+    assert stage_count('cache_hit') == 0
+    write_parcel_config(config_path, n_cols - 1, ['table_0', 'table_1', 'table_2'])
+    run(cache_dir=cache_dir)
+    assert stage_count('cache_hit') == 0
+
+
+def test_chunked_read_matches_the_full_read(tmp_path):
+    n_cols = 8
+    paths = write_parcel_csvs(str(tmp_path / 'csv'), 2, 40000, n_cols)
+    config_path = str(tmp_path / 'config.json')
+    write_parcel_config(config_path, n_cols, ['table_0', 'table_1'])
+    settings = {'config_path': config_path, 'gpkg_path': 'reference.gpkg', 'gpkg_id': 'PARCEL_ID', 'co_missing': True, 'low': 5, 'high': 80}
+
+    full = Create_Report(**settings)
+    full.profile(paths)
+    chunked = Create_Report(max_memory_mb=1, **settings)
+    chunked.profile(paths)
+
+    #a 1MB budget splits each file into several chunks
+    assert chunked.chunk_rows(paths[0], lambda c: c in chunked.rename_dict) < 20000
+    assert profiled(chunked) == profiled(full)
+    for file_name, co_missing in full.co_missing.items():
+        assert chunked.co_missing[file_name].features == co_missing.features
+        assert (chunked.co_missing[file_name].matrix == co_missing.matrix).all()
+        assert chunked.co_missing[file_name].patterns == co_missing.patterns
+
+
+#profiling placemarks straight from the kmz counts what profiling its converted csv would
+def test_profile_kmz_matches_the_converted_csv(tmp_path):
+    pytest.importorskip('lxml')
+    from data_processing_tools.kmz_to_csv.kmz_to_csv import kmz_to_csv
+
+    n_cols = 8
+    kmz_path = str(tmp_path / 'parcels.kmz')
+    #na strings read_csv would turn into nulls, and two columns that first show up halfway through
+    write_kmz(kmz_path, 600, n_cols, na_values=['N/A', 'NULL', 'nan', '#N/A'], late_cols=2)
+    config_path = str(tmp_path / 'config.json')
+    write_parcel_config(config_path, n_cols, ['Parcels'])
+    csv_path = str(tmp_path / 'Parcels.csv')
+    kmz_to_csv(kmz_path, stream=True, output_format='csv', output_path=csv_path)
+
+    settings = {'config_path': config_path, 'gpkg_path': 'reference.gpkg', 'gpkg_id': 'PARCEL_ID', 'low': 5, 'high': 80}
+    from_csv = Create_Report(**settings)
+    from_csv.profile([csv_path])
+    from_kmz = Create_Report(**settings)
+    from_kmz.profile_kmz(kmz_path, batch_size=100)
+
+    assert profiled(from_kmz) == profiled(from_csv)
+    total_count, missing_counts = from_kmz.file_counts['Parcels']
+    assert total_count == 600
+    assert missing_counts[f"CLIENT_{n_cols - 1}"] >= 300
+    assert any(from_kmz.missing_ids_by_feature.ids(hash) for hash in from_kmz.missing_ids_by_feature)
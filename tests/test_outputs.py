@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+from data_processing_tools.kmz_to_csv.outputs import make_output
+
+#'c' only shows up in the second batch, empty cells stay empty strings in every format
+BATCHES = [
+    [{'a': '1', 'b': ''}, {'a': '2', 'b': 'x'}],
+    [{'a': '3', 'c': 'late'}, {'a': '', 'b': 'y', 'c': ''}],
+]
+EXPECTED = {
+    'a': ['1', '2', '3', ''],
+    'b': ['', 'x', None, 'y'],
+    'c': [None, None, 'late', ''],
+}
+
+
+def read_output(path, output_format):
+    if output_format == 'parquet':
+        return pd.read_parquet(path)
+    if output_format == 'feather':
+        return pd.read_feather(path)
+    import geopandas as gpd
+    return pd.DataFrame(gpd.read_file(path).drop(columns='geometry'))
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'feather', 'gpkg'])
+def test_columns_that_show_up_late_are_kept(tmp_path, output_format):
+    geometries = None
+    if output_format == 'gpkg':
+        pytest.importorskip('geopandas')
+        from shapely.geometry import Point
+        geometries = [Point(0, 0), Point(1, 1)]
+
+    path = str(tmp_path / f"Parcels.{output_format}")
+    output = make_output(output_format, path)
+    for rows in BATCHES:
+        output.write(rows, geometries)
+    output.close()
+
+    df = read_output(path, output_format)
+    assert list(df.columns) == list(EXPECTED)
+    for column, values in EXPECTED.items():
+        assert [None if pd.isna(v) else v for v in df[column]] == values
+    assert os.listdir(tmp_path) == [f"Parcels.{output_format}"]
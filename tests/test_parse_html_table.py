@@ -0,0 +1,34 @@
+import glob
+import os
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('bs4')
+from data_processing_tools.kmz_to_csv.kmz_to_csv import parse_html_table, parse_html_table_soup
+from benchmarks.generators import description_html
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'descriptions', '*.html')))
+
+
+def read_fixture(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+#the lxml parser has to give the same dictionaries the BeautifulSoup one always has
+@pytest.mark.parametrize('path', FIXTURES, ids=[os.path.basename(p) for p in FIXTURES])
+def test_matches_soup(path):
+    description = read_fixture(path)
+    assert parse_html_table(description) == parse_html_table_soup(description)
+
+
+def test_matches_soup_on_generated_descriptions():
+    description = description_html({'PARCEL_ID': 'P0000001', 'zoning': '', 'sale_price': '250000', 'city': 'Boulder &amp; Co'})
+    assert parse_html_table(description) == parse_html_table_soup(description)
+
+
+#html.parser nests unclosed cells, so these keep the original (odd) keys
+def test_unclosed_cells_keep_the_soup_result():
+    description = read_fixture(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'descriptions', 'unclosed_cells.html'))
+    assert parse_html_table(description) == {'k1v1': 'v1', 'k2v2': 'v2'}
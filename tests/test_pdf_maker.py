@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+pytest.importorskip('reportlab')
+from data_processing_tools.init_data_report.pdf_maker import make_report_pdf
+from benchmarks.generators import write_logo
+
+
+#a pattern missing every column of a 300 column csv used to make a row taller than a page
+@pytest.mark.parametrize('fast', [False, True])
+def test_wide_missing_pattern_fits_on_a_page(tmp_path, fast):
+    logo_path = str(tmp_path / 'logos' / 'test.png')
+    write_logo(logo_path)
+
+    features = [f"synthetic_feature_column_{i:03d}" for i in range(300)]
+    data = [[feature, 'parcels', 50.0, 0] for feature in features]
+    patterns = [['parcels', 1200, 30.0, features], ['parcels', 800, 20.0, features[:150]]]
+
+    path = str(tmp_path / 'missing_values_report.pdf')
+    make_report_pdf(data, fast=fast, path=path, logo_path=logo_path, patterns=patterns)
+    assert os.path.getsize(path) > 0
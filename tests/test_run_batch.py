@@ -0,0 +1,37 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from data_processing_tools.batch_runner import run_batch
+
+#the test tools are patched into TOOLS, which only reaches the workers when they are forked
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="needs forked workers")
+
+
+def crash(job):
+    time.sleep(0.2)
+    os._exit(1)
+
+
+def finish(job):
+    time.sleep(1)
+
+
+def test_only_the_crashing_job_fails(tmp_path, monkeypatch):
+    monkeypatch.setitem(run_batch.TOOLS, 'crash', crash)
+    monkeypatch.setitem(run_batch.TOOLS, 'finish', finish)
+
+    jobs = []
+    for name, tool in [('first', 'finish'), ('crashes', 'crash'), ('second', 'finish'), ('third', 'finish')]:
+        jobs.append({'name': name, 'tool': tool, 'input': str(tmp_path), 'config': 'config.json', 'output_dir': str(tmp_path / name)})
+
+    summary_path = str(tmp_path / 'summary.json')
+    results = asyncio.run(run_batch.run_batch(jobs, 3, summary_path))
+
+    assert {r['name']: r['status'] for r in results} == {'first': 'ok', 'crashes': 'failed', 'second': 'ok', 'third': 'ok'}
+    with open(summary_path, "r") as json_file:
+        assert len(json.load(json_file)) == 4
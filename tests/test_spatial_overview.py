@@ -0,0 +1,15 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+gpd = pytest.importorskip('geopandas')
+from data_processing_tools.spatial_overview import tile_layer
+
+
+def test_tile_layer_skips_rows_without_coordinates():
+    geometry = gpd.GeoSeries(list(gpd.points_from_xy([0.5, 1.5, np.nan, 0.25], [0.5, 0.5, np.nan, 0.75])) + [None], crs='EPSG:4326')
+    mask = np.array([True, False, True, True, True])
+
+    tiles = tile_layer(geometry, {'zoning': mask}, 1.0)
+
+    assert tiles[['tile_x', 'tile_y', 'rows', 'zoning']].values.tolist() == [[0, 0, 2, 2], [1, 0, 1, 0]]
+    assert np.isfinite(tiles.total_bounds).all()